@@ -1 +1,3 @@
-print("Welcome to the Monte Carlo Simulator.")
\ No newline at end of file
+"""
+Monte Carlo simulator of dice games.
+"""
@@ -0,0 +1,243 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from montecarlo_dir.montecarlo import Die, Game, Analyzer
+
+#Benchmarked operations, in the order they run for every configuration
+BENCHMARKS = ('Die.roll', 'Game.play', "Game.show('wide')", "Game.show('narrow')",
+              'Analyzer.jackpot', 'Analyzer.combo', 'Analyzer.face_counts_per_roll')
+
+
+def _measure(func, setup = None, repeat = 3):
+    '''
+    PURPOSE: This function times a function and measures the peak memory it allocates.
+    Timing takes the best of several runs with memory tracing off. Peak memory is measured on one extra traced run.
+
+    INPUTS:
+    func callable taking no arguments
+    setup None or callable run untimed before every run (e.g. to clear cached results)
+    repeat int (number of timed runs)
+
+    OUTPUT:
+    Tuple of the best wall time in seconds and the peak traced allocation in bytes
+    '''
+    best = float('inf')
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+def import_time(module = 'montecarlo_dir.montecarlo', repeat = 3):
+    '''
+    PURPOSE: This function measures how long a fresh Python process takes to import a module, and whether that pulls in pandas.
+    Every run uses a new interpreter, so nothing is already imported. As in _measure, timing takes the best of
+    several untraced runs and peak memory is measured on one extra traced run.
+
+    INPUTS:
+    module str
+    repeat int (number of timed runs)
+
+    OUTPUT:
+    Dict holding the module, the best import time in seconds, the peak traced allocation in bytes
+    and whether pandas was imported
+    '''
+    script = ('import sys, time, tracemalloc\n'
+              'if sys.argv[1] == "trace": tracemalloc.start()\n'
+              'start = time.perf_counter()\n'
+              'import {}\n'
+              'seconds = time.perf_counter() - start\n'
+              'print(seconds, tracemalloc.get_traced_memory()[1], "pandas" in sys.modules)').format(module)
+
+    def run(mode):
+        output = subprocess.run([sys.executable, '-c', script, mode], check=True, capture_output=True, text=True).stdout.split()
+        return float(output[-3]), int(output[-2]), output[-1] == 'True'
+
+    seconds = min(run('time')[0] for i in range(repeat))
+    peak, pandas = run('trace')[1:]
+    return {'benchmark': 'import ' + module, 'seconds': seconds, 'peak_bytes': peak, 'imports_pandas': pandas}
+
+def _make_dice(num_dice, num_faces, face_type):
+    '''
+    PURPOSE: This function builds the dice of one benchmark configuration. Every second face gets weight 2.
+
+    INPUTS:
+    num_dice int
+    num_faces int
+    face_type str ('numeric' or 'string')
+
+    OUTPUT:
+    List of Die objects
+    '''
+    faces = np.arange(1, num_faces + 1)
+    if face_type == 'string':
+        faces = np.array(['face ' + str(f) for f in faces])
+    dice = []
+    for j in range(num_dice):
+        die = Die(faces, seed=j)
+        for face in faces[::2]:
+            die.change_weight(face, 2)
+        dice.append(die)
+    return dice
+
+def run_benchmarks(num_plays = (10**3, 10**4, 10**5, 10**6), num_dice = (2, 8), num_faces = (6, 100),
+                   face_types = ('numeric', 'string'), benchmarks = BENCHMARKS, repeat = 3):
+    '''
+    PURPOSE: This function times and memory-profiles the simulator over a sweep of game sizes.
+    Analyzer methods run with caching disabled and Game.show runs after a fresh play, so every run does the full work.
+
+    INPUTS:
+    num_plays iterable of int
+    num_dice iterable of int
+    num_faces iterable of int
+    face_types iterable of str ('numeric' and/or 'string')
+    benchmarks iterable of benchmark names (see BENCHMARKS)
+    repeat int (number of timed runs per benchmark)
+
+    OUTPUT:
+    List of dicts, one per benchmark and configuration, holding the configuration, seconds and peak_bytes
+    '''
+    results = []
+    for face_type in face_types:
+        for faces in num_faces:
+            for dice in num_dice:
+                for plays in num_plays:
+                    game = Game(_make_dice(dice, faces, face_type), seed=0)
+                    game.play(plays, seed=0)
+                    analyzer = Analyzer(game, cache_size=0)
+                    replay = lambda: game.play(plays, seed=0)
+                    cases = {'Die.roll': (lambda: game.DieList[0].roll(plays, seed=0), None),
+                             'Game.play': (replay, None),
+                             "Game.show('wide')": (lambda: game.show('wide'), replay),
+                             "Game.show('narrow')": (lambda: game.show('narrow'), replay),
+                             'Analyzer.jackpot': (analyzer.jackpot, None),
+                             'Analyzer.combo': (analyzer.combo, None),
+                             'Analyzer.face_counts_per_roll': (analyzer.face_counts_per_roll, None)}
+                    for name in benchmarks:
+                        func, setup = cases[name]
+                        seconds, peak = _measure(func, setup, repeat)
+                        results.append({'benchmark': name, 'num_plays': plays, 'num_dice': dice, 'num_faces': faces,
+                                        'face_type': face_type, 'seconds': seconds, 'peak_bytes': peak})
+    return results
+
+def environment():
+    '''
+    PURPOSE: This function describes the environment benchmarks ran in, so results from different machines can be told apart.
+
+    INPUTS:
+    None
+
+    OUTPUT:
+    Dict of Python, NumPy and pandas versions and platform
+    '''
+    import pandas as pd
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'platform': platform.platform(), 'processor': platform.processor()}
+
+def _key(result):
+    '''
+    PURPOSE: This function identifies the benchmark and configuration of a result.
+
+    INPUTS:
+    result dict
+
+    OUTPUT:
+    Tuple
+    '''
+    return (result['benchmark'], result.get('num_plays'), result.get('num_dice'), result.get('num_faces'), result.get('face_type'))
+
+def compare(results, baseline, threshold = 0.2, min_seconds = 1e-3):
+    '''
+    PURPOSE: This function compares results against a baseline and finds regressions.
+    A result regresses when its time exceeds the baseline time by more than the threshold.
+    Configurations missing from the baseline, and results faster than min_seconds (too noisy to compare), are skipped.
+
+    INPUTS:
+    results list of dicts returned by run_benchmarks
+    baseline list of dicts returned by run_benchmarks
+    threshold float (allowed relative slowdown, 0.2 is 20%)
+    min_seconds float
+
+    OUTPUT:
+    List of dicts of the regressed results, each with the baseline seconds and the ratio of new to baseline time
+    '''
+    previous = {_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(_key(result))
+        if old is None or old['seconds'] <= 0 or result['seconds'] < min_seconds:
+            continue
+        ratio = result['seconds'] / old['seconds']
+        if ratio > 1 + threshold:
+            regressions.append(dict(result, baseline_seconds=old['seconds'], ratio=ratio))
+    return regressions
+
+def main(argv = None):
+    '''
+    PURPOSE: This function runs the benchmarks from the command line, writes them as JSON and checks them against a baseline.
+
+    INPUTS:
+    argv None or list of str (defaults to the command line arguments)
+
+    OUTPUT:
+    Returns exit status 1 when a regression is found, otherwise 0
+    '''
+    parser = argparse.ArgumentParser(description='Time and memory-profile the Monte Carlo simulator.')
+    parser.add_argument('--num-plays', type=lambda v: int(float(v)), nargs='+', default=[10**3, 10**4, 10**5, 10**6],
+                        help='numbers of plays to sweep (e.g. 1e3 1e8)')
+    parser.add_argument('--num-dice', type=int, nargs='+', default=[2, 8])
+    parser.add_argument('--num-faces', type=int, nargs='+', default=[6, 100])
+    parser.add_argument('--face-types', nargs='+', choices=['numeric', 'string'], default=['numeric', 'string'])
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-import', action='store_true', help='skip timing the import of the simulator')
+    parser.add_argument('--output', help='JSON file the results are written to')
+    parser.add_argument('--baseline', help='JSON file of earlier results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative slowdown (default 0.2)')
+    parser.add_argument('--min-seconds', type=float, default=1e-3, help='skip comparing results faster than this')
+    args = parser.parse_args(argv)
+
+    results = []
+    if not args.no_import:
+        result = import_time(repeat=args.repeat)
+        print('{benchmark:32} pandas imported: {imports_pandas!s:31} {seconds:10.6f}s {peak_bytes:>14,d}B'.format(**result))
+        results.append(result)
+    sweep = run_benchmarks(args.num_plays, args.num_dice, args.num_faces, args.face_types, args.benchmarks, args.repeat)
+    for result in sweep:
+        print('{benchmark:32} plays={num_plays:<10} dice={num_dice:<4} faces={num_faces:<5} {face_type:8} '
+              '{seconds:10.6f}s {peak_bytes:>14,d}B'.format(**result))
+    results += sweep
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        for result in regressions:
+            label = ' '.join(str(value) for value in _key(result) if value is not None)
+            print('REGRESSION {}: {:.6f}s vs {:.6f}s ({:.2f}x)'.format(label, result['seconds'], result['baseline_seconds'], result['ratio']))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import numpy as np
+from montecarlo_dir.montecarlo import (Game, JackpotAccumulator, ComboAccumulator, FaceCountAccumulator,
+                                       _count_faces, _code_dtype, _seed_meta, _make_die,
+                                       _face_tables)
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+#Statistics a spec can ask for, and formats rolls can be written in
+STATISTICS = ('jackpot', 'face_counts', 'combo')
+ROLL_FORMATS = ('csv', 'npy', 'none')
+
+#Results written to the output directory
+_ROLLS_CSV = 'rolls.csv'
+_ROLLS_DIR = 'rolls'
+_FACE_COUNTS_CSV = 'face_counts.csv'
+_FACE_COUNTS_NPY = 'face_counts.npy'
+_COMBOS_CSV = 'combos.csv'
+_SUMMARY_FILE = 'summary.json'
+
+
+def load_spec(path):
+    '''
+    PURPOSE: This function reads a game spec from a JSON or TOML file.
+
+    INPUTS:
+    path str (.json or .toml)
+
+    OUTPUT:
+    Dict
+    '''
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ValueError('Reading TOML specs needs Python 3.11 or later. Use a JSON spec instead.')
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+def build_game(spec):
+    '''
+    PURPOSE: This function builds the Game described by a spec. Every entry of spec['dice'] holds faces,
+    optional weights aligned with them and an optional count of identical dice.
+
+    INPUTS:
+    spec dict
+
+    OUTPUT:
+    Game object
+    '''
+    dice = []
+    for entry in spec['dice']:
+        for i in range(entry.get('count', 1)):
+            dice.append(_make_die(np.array(entry['faces']), entry.get('weights')))
+    return Game(dice)
+
+def _write_rows(f, rows, header = None):
+    '''
+    PURPOSE: This function appends rows to an open CSV file, writing the header first when given.
+    Values holding commas, quotes or line breaks are quoted.
+
+    INPUTS:
+    f file open for writing with newline=''
+    rows array of shape rows by columns
+    header None or list of str
+
+    OUTPUT:
+    None
+    '''
+    writer = csv.writer(f, lineterminator='\n')
+    if header is not None:
+        writer.writerow(header)
+    writer.writerows(np.asarray(rows).tolist())
+
+def run(spec, output, rolls = None, chunk_size = None, seed = None, progress = None):
+    '''
+    PURPOSE: This function plays the Game of a spec chunk by chunk and streams results to an output directory,
+    so memory use is bounded by the chunk size whatever the number of plays.
+    Rolls are written as rolls.csv (faces), as a results directory that Game.load can open (npy), or not at all.
+    Per-roll face counts are appended to face_counts.csv (or face_counts.npy with npy rolls) chunk by chunk.
+    Jackpot and face totals go to summary.json and combinations to combos.csv once all chunks are counted.
+
+    INPUTS:
+    spec dict (dice, num_plays and optionally seed, chunk_size, rolls, statistics, top_k)
+    output str (output directory, created if missing)
+    rolls None or str ('csv', 'npy' or 'none', overrides the spec)
+    chunk_size None or int (plays per chunk, overrides the spec)
+    seed None or int (overrides the spec)
+    progress None or callable taking the number of plays done and the total (called after every chunk)
+
+    OUTPUT:
+    Returns the summary dict written to summary.json.
+    Returns error message for invalid statistics or roll format.
+    '''
+    statistics = spec.get('statistics', list(STATISTICS))
+    rolls = rolls or spec.get('rolls', 'none')
+    if any(statistic not in STATISTICS for statistic in statistics):
+        return "Not a valid statistic. Try again."
+    if rolls not in ROLL_FORMATS:
+        return "Not a valid roll format. Try again."
+    chunk_size = chunk_size or spec.get('chunk_size', 1 << 20)
+    seed = spec.get('seed') if seed is None else seed
+    num_plays = spec['num_plays']
+    os.makedirs(output, exist_ok=True)
+
+    game = build_game(spec)
+    seed_seq = game._start(seed)
+    face_tables = _face_tables(game.DieList)
+    columns = ['Die ' + str(j+1) for j in range(len(face_tables))]
+    jackpot = JackpotAccumulator(face_tables)
+    faces = FaceCountAccumulator(face_tables)
+    combos = ComboAccumulator(face_tables) if 'combo' in statistics else None
+
+    if rolls == 'npy':
+        #The face codes go straight to a memory-mapped results directory, then are read back a chunk at a time
+        game.play(num_plays, seed=seed_seq, path=os.path.join(output, _ROLLS_DIR))
+        codes = game.show_codes()[0]
+        chunks = (codes[start:start+chunk_size] for start in range(0, num_plays, chunk_size))
+    else:
+        chunks = game.play_stream(num_plays, chunk_size, seed_seq)
+
+    files = []
+    try:
+        rolls_file = face_counts_file = face_counts_npy = None
+        if rolls == 'csv':
+            rolls_file = open(os.path.join(output, _ROLLS_CSV), 'w', newline='')
+            files.append(rolls_file)
+        if 'face_counts' in statistics:
+            shape = (num_plays, len(faces.faces))
+            if rolls == 'npy':
+                face_counts_npy = np.lib.format.open_memmap(os.path.join(output, _FACE_COUNTS_NPY), mode='w+',
+                                                            dtype=_code_dtype(len(face_tables) + 1), shape=shape)
+            else:
+                face_counts_file = open(os.path.join(output, _FACE_COUNTS_CSV), 'w', newline='')
+                files.append(face_counts_file)
+
+        done = 0
+        for chunk in chunks:
+            roll_numbers = np.arange(done + 1, done + len(chunk) + 1)
+            if rolls_file is not None:
+                decoded = np.column_stack([roll_numbers] + [face_tables[j][chunk[:, j]] for j in range(len(columns))])
+                _write_rows(rolls_file, decoded, ['roll #'] + columns if done == 0 else None)
+            if face_counts_npy is not None or face_counts_file is not None:
+                counts = _count_faces(chunk, faces.lookups, len(faces.faces))
+                if face_counts_npy is not None:
+                    face_counts_npy[done:done+len(chunk)] = counts
+                else:
+                    _write_rows(face_counts_file, np.column_stack((roll_numbers, counts)),
+                                ['roll #'] + faces.faces.tolist() if done == 0 else None)
+            jackpot.update(chunk)
+            faces.update(chunk)
+            if combos is not None:
+                combos.update(chunk)
+            done += len(chunk)
+            if progress is not None:
+                progress(done, num_plays)
+        if face_counts_npy is not None:
+            face_counts_npy.flush()
+    finally:
+        for f in files:
+            f.close()
+
+    summary = {'num_plays': num_plays, 'dice': len(face_tables),
+               'seed': _seed_meta(seed_seq)}
+    if 'jackpot' in statistics:
+        summary['jackpot'] = jackpot.count
+    if 'face_counts' in statistics:
+        summary['face_totals'] = dict(zip([str(f) for f in faces.faces.tolist()], faces.totals.tolist()))
+    if combos is not None:
+        #Most frequent combinations first, ties in face order as in Analyzer.combo
+        rows = combos.rows()
+        order = np.argsort(-combos.counts, kind='stable')[:spec.get('top_k')]
+        decoded = np.column_stack([face_tables[j][rows[order, j]] for j in range(len(columns))] + [combos.counts[order]])
+        with open(os.path.join(output, _COMBOS_CSV), 'w', newline='') as f:
+            _write_rows(f, decoded, columns + ['count'])
+        summary['combos'] = len(combos.counts)
+    with open(os.path.join(output, _SUMMARY_FILE), 'w') as f:
+        json.dump(summary, f, indent=1)
+    return summary
+
+def main(argv = None):
+    '''
+    PURPOSE: This function runs a game spec from the command line.
+
+    INPUTS:
+    argv None or list of str (defaults to the command line arguments)
+
+    OUTPUT:
+    Returns exit status 0, or 1 for an invalid spec
+    '''
+    parser = argparse.ArgumentParser(prog='montecarlo', description='Play a Monte Carlo dice game from a JSON or TOML spec.')
+    parser.add_argument('spec', help='JSON or TOML file describing dice, num_plays, seed and statistics')
+    parser.add_argument('-o', '--output', required=True, help='directory results are written to')
+    parser.add_argument('--rolls', choices=ROLL_FORMATS, help='format rolls are written in (overrides the spec)')
+    parser.add_argument('--chunk-size', type=lambda v: int(float(v)), help='plays per chunk (overrides the spec)')
+    parser.add_argument('--seed', type=int, help='seed (overrides the spec)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not report progress')
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.spec)
+    except (OSError, ValueError) as error:
+        print('Not a valid spec: ' + str(error), file=sys.stderr)
+        return 1
+    if 'dice' not in spec or 'num_plays' not in spec:
+        print('Not a valid spec: dice and num_plays are required.', file=sys.stderr)
+        return 1
+
+    progress = None
+    if not args.quiet:
+        progress = lambda done, total: print('{} / {} plays'.format(done, total), file=sys.stderr)
+    summary = run(spec, args.output, args.rolls, args.chunk_size, args.seed, progress)
+    if isinstance(summary, str):
+        print(summary, file=sys.stderr)
+        return 1
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,724 @@
-import pandas as pd
 import numpy as np
-import random
+import functools
+import importlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from statistics import NormalDist
+
+#Number of plays drawn from one random stream. Streamed chunks are made of whole blocks
+#so chunked and in-memory plays with the same seed give the same results.
+_BLOCK_SIZE = 1 << 14
+
+#Ways of drawing the uniforms behind rolls, see _uniforms
+_SAMPLINGS = ('iid', 'stratified', 'lhs', 'antithetic')
+
+#Files of a saved Game results directory
+_CODES_FILE = 'codes.npy'
+_WEIGHTS_FILE = 'weights.npy'
+_META_FILE = 'meta.json'
+
+class _LazyModule:
+    """
+    A stand-in for a module that is only imported when one of its attributes is first used.
+    The import then replaces the stand-in in this module's namespace, so later uses cost nothing extra.
+    """
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attribute)
+
+#pandas is only needed for dataframe views of results, so rolling, playing and counting import NumPy alone
+pd = _LazyModule('pandas', 'pd')
+
+#Worker pool shared by every async method, see async_pool
+_ASYNC_POOL = None
+_ASYNC_LOCK = threading.RLock()
+
+#Instrumentation settings while enabled, see instrument. None while disabled.
+_INSTRUMENTATION = None
+#Per-thread stack of RunStats of the instrumented methods running
+_RUNS = threading.local()
+
+
+def _as_generator(seed=None):
+    '''
+    PURPOSE: This function turns a seed into a NumPy random Generator.
+
+    INPUTS:
+    seed None, int, SeedSequence or Generator
+
+    OUTPUT:
+    Returns the Generator itself if one is passed, otherwise a new Generator seeded with seed.
+    '''
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+def _as_seed_sequence(seed=None):
+    '''
+    PURPOSE: This function turns a seed into a NumPy SeedSequence.
+
+    INPUTS:
+    seed None, int, SeedSequence or Generator
+
+    OUTPUT:
+    Returns the SeedSequence itself if one is passed, otherwise a new SeedSequence built from seed.
+    A Generator is used to draw the entropy of the new SeedSequence.
+    '''
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(seed.integers(0, 2**63, size=4))
+    return np.random.SeedSequence(seed)
+
+def _seed_meta(seed_seq):
+    '''
+    PURPOSE: This function describes a SeedSequence with plain JSON types, so it can be written to meta.json or a summary.
+    The entropy of a SeedSequence drawn from a Generator is an array, which is written as a list.
+
+    INPUTS:
+    seed_seq SeedSequence
+
+    OUTPUT:
+    Dict of the entropy (int or list of int) and the spawn key (list of int)
+    '''
+    return {'entropy': np.asarray(seed_seq.entropy).tolist(), 'spawn_key': [int(k) for k in seed_seq.spawn_key]}
+
+def _block_generator(seed_seq, block):
+    '''
+    PURPOSE: This function builds the random Generator for one block of plays.
+    It matches the child that seed_seq.spawn would hand out for that block, without spawning the blocks before it.
+
+    INPUTS:
+    seed_seq SeedSequence of the play
+    block int
+
+    OUTPUT:
+    Generator
+    '''
+    child = np.random.SeedSequence(seed_seq.entropy, spawn_key=seed_seq.spawn_key + (block,), pool_size=seed_seq.pool_size)
+    return np.random.default_rng(child)
+
+def _uniforms(rng, n, sampling = 'iid'):
+    '''
+    PURPOSE: This function draws the uniforms on [0, 1) that are turned into face codes.
+
+    INPUTS:
+    rng Generator
+    n int
+    sampling str ('iid' for independent draws, 'stratified' or 'lhs' for one draw in each of n equal strata in
+                  shuffled order, 'antithetic' for a second half mirroring the first half as 1 - u)
+
+    OUTPUT:
+    Array (dtype float) of n uniforms
+    '''
+    if sampling == 'iid':
+        return rng.random(n)
+    if sampling == 'antithetic':
+        half = rng.random(-(-n // 2))
+        u = np.concatenate([half, 1 - half])[:n]
+    else:
+        u = (rng.permutation(n) + rng.random(n)) / n
+    #1 - u can reach 1.0, which has no face
+    return np.minimum(u, np.nextafter(1.0, 0.0), out=u)
+
+def _inverse_cdf(cdf, u):
+    '''
+    PURPOSE: This function maps uniform draws on [0, 1) to face codes by inverse-CDF lookup.
+
+    INPUTS:
+    cdf array (dtype float) of cumulative normalized weights
+    u array (dtype float)
+
+    OUTPUT:
+    Array (dtype int) of face codes, i.e. positions in the faces array
+    '''
+    codes = np.searchsorted(cdf, u, side='right')
+    #Guard against rounding in the last cumulative weight
+    np.minimum(codes, len(cdf) - 1, out=codes)
+    return codes
+
+def _proposal_tables(dice, proposal):
+    '''
+    PURPOSE: This function prepares importance sampling tables from one proposal weights array per die.
+
+    INPUTS:
+    dice list of Die objects
+    proposal list of weights arrays, one per die and aligned with its faces
+
+    OUTPUT:
+    List of (likelihood ratio per face, proposal cdf) tuples, or None when the proposal is not valid.
+    A proposal is valid when its weights are non-negative and positive wherever the die's weight is.
+    '''
+    if len(proposal) != len(dice):
+        return None
+    tables = []
+    for c, q in zip(dice, proposal):
+        q = np.asarray(q, dtype=float)
+        p = c.weights / np.sum(c.weights, dtype=float)
+        if q.shape != p.shape or (q < 0).any() or ((p > 0) & (q <= 0)).any():
+            return None
+        q = q / q.sum()
+        ratio = np.divide(p, q, out=np.zeros_like(p), where=q > 0)
+        tables.append((ratio, np.cumsum(q) / np.sum(q)))
+    return tables
+
+def _fill_block(dice, out, seed_seq, block, sampling = 'iid', proposal = None, weights = None):
+    '''
+    PURPOSE: This function rolls every die for one block of plays, writing face codes in place.
+    Codes refer to each die's distinct faces (see Die._face_table).
+    With a proposal, dice are rolled from the proposal and the likelihood ratio of every roll is multiplied into weights.
+
+    INPUTS:
+    dice list of Die objects
+    out array (view of shape block rolls by M dice)
+    seed_seq SeedSequence of the play
+    block int (position of the block within the play)
+    sampling str (see _uniforms)
+    proposal None or list of tables built by _proposal_tables
+    weights None or array (view of the block's sample weights, initialized to 1)
+
+    OUTPUT:
+    None
+    '''
+    rng = _block_generator(seed_seq, block)
+    for j, c in enumerate(dice):
+        u = _uniforms(rng, len(out), sampling)
+        if proposal is None:
+            codes = c._codes_from_uniform(u)
+        else:
+            codes = _inverse_cdf(proposal[j][1], u)
+            weights *= proposal[j][0][codes]
+        remap = c._face_table()[1]
+        out[:, j] = codes if remap is None else remap[codes]
+
+def _face_tables(dice):
+    '''
+    PURPOSE: This function returns the face tables game results of the dice are coded against.
+
+    INPUTS:
+    dice list of Die objects
+
+    OUTPUT:
+    List of per-die arrays of distinct faces
+    '''
+    return [c._face_table()[0] for c in dice]
+
+def _play_blocks(dice, seed_seq, first, stop, num_plays, dtype, sampling = 'iid', proposal = None):
+    '''
+    PURPOSE: This function plays a contiguous range of blocks. It is the unit of work sent to worker processes.
+
+    INPUTS:
+    dice list of Die objects
+    seed_seq SeedSequence of the play
+    first int (first block)
+    stop int (block after the last block)
+    num_plays int (plays in the whole game, used to size the last block)
+    dtype NumPy dtype of the face codes
+    sampling str (see _uniforms)
+    proposal None or list of tables built by _proposal_tables
+
+    OUTPUT:
+    Tuple of the face-code matrix of shape range rolls by M dice and the sample weights (None without a proposal)
+    '''
+    start = first * _BLOCK_SIZE
+    out = np.empty((min(stop * _BLOCK_SIZE, num_plays) - start, len(dice)), dtype=dtype)
+    weights = None if proposal is None else np.ones(len(out))
+    for block in range(first, stop):
+        offset = (block - first) * _BLOCK_SIZE
+        _fill_block(dice, out[offset:offset+_BLOCK_SIZE], seed_seq, block, sampling, proposal,
+                    None if weights is None else weights[offset:offset+_BLOCK_SIZE])
+    return out, weights
+
+def _split_blocks(num_plays, workers):
+    '''
+    PURPOSE: This function splits the blocks of a play into contiguous ranges, one per worker.
+
+    INPUTS:
+    num_plays int
+    workers int
+
+    OUTPUT:
+    List of (first, stop) block ranges, skipping empty ones
+    '''
+    num_blocks = -(-num_plays // _BLOCK_SIZE)
+    edges = np.linspace(0, num_blocks, workers + 1).round().astype(int)
+    return [(int(first), int(stop)) for first, stop in zip(edges[:-1], edges[1:]) if stop > first]
+
+def _make_pool(executor, workers):
+    '''
+    PURPOSE: This function builds the worker pool used by parallel plays.
+
+    INPUTS:
+    executor str ('thread' or 'process')
+    workers int
+
+    OUTPUT:
+    ThreadPoolExecutor or ProcessPoolExecutor, or None for an invalid executor
+    '''
+    if executor == 'thread':
+        return ThreadPoolExecutor(workers)
+    if executor == 'process':
+        return ProcessPoolExecutor(workers)
+    return None
+
+def async_pool(workers = None):
+    '''
+    PURPOSE: This function returns the bounded thread pool every async method (Game.play_async, Analyzer.combo_async)
+    runs its chunks on. Chunks of concurrent simulations queue on the same pool, so small requests are not stuck
+    behind large ones and the number of busy threads never exceeds the pool size.
+
+    INPUTS:
+    workers None or int (replaces the pool with one of this many threads; defaults to the number of CPUs on first use)
+
+    OUTPUT:
+    ThreadPoolExecutor
+    '''
+    global _ASYNC_POOL
+    with _ASYNC_LOCK:
+        if workers is not None and _ASYNC_POOL is not None:
+            #Chunks already submitted to the old pool still finish there. Runs in flight send their next chunk
+            #to the new pool, as _run_async looks the pool up for every chunk.
+            _ASYNC_POOL.shutdown(wait=False)
+            _ASYNC_POOL = None
+        if _ASYNC_POOL is None:
+            _ASYNC_POOL = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1, thread_name_prefix='montecarlo')
+        return _ASYNC_POOL
+
+def _run_async(loop, func, *args):
+    '''
+    PURPOSE: This function schedules one chunk of async work on the current shared pool.
+    The pool is looked up for every chunk, under the same lock async_pool replaces it with,
+    so a run never submits to a pool that has been shut down.
+
+    INPUTS:
+    loop event loop
+    func callable
+    args arguments of func
+
+    OUTPUT:
+    Awaitable future of func's return value
+    '''
+    with _ASYNC_LOCK:
+        return loop.run_in_executor(async_pool(), func, *args)
+
+def _open_codes(path, shape, dtype):
+    '''
+    PURPOSE: This function creates the face-code file of a results directory and maps it into memory for writing.
+
+    INPUTS:
+    path str (results directory, created if missing)
+    shape tuple (N rolls, M dice)
+    dtype NumPy dtype of the face codes
+
+    OUTPUT:
+    Writable numpy memmap of the given shape
+    '''
+    os.makedirs(path, exist_ok=True)
+    return np.lib.format.open_memmap(os.path.join(path, _CODES_FILE), mode='w+', dtype=dtype, shape=shape)
+
+def _load_codes(path):
+    '''
+    PURPOSE: This function maps the face-code file of a results directory into memory without reading it.
+
+    INPUTS:
+    path str (results directory)
+
+    OUTPUT:
+    Read-only numpy memmap of shape N rolls by M dice
+    '''
+    return np.load(os.path.join(path, _CODES_FILE), mmap_mode='r')
+
+class _LRUCache:
+    """
+    A class to hold a bounded number of results, evicting the least recently used one first.
+    """
+    def __init__(self, maxsize):
+        """
+        Constructs all the necessary attributes for the _LRUCache object.
+
+        INPUTS:
+        maxsize : int (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self.__items = OrderedDict()
+
+    def get(self, key):
+        '''
+        PURPOSE: This method returns a cached item and marks it as recently used.
+
+        INPUTS:
+        key hashable
+
+        OUTPUT:
+        The cached item, or None when missing
+        '''
+        if key not in self.__items:
+            return None
+        self.__items.move_to_end(key)
+        return self.__items[key]
+
+    def put(self, key, item):
+        '''
+        PURPOSE: This method caches an item, evicting the least recently used items beyond maxsize.
+
+        INPUTS:
+        key hashable
+        item any
+
+        OUTPUT:
+        None
+        '''
+        self.__items[key] = item
+        self.__items.move_to_end(key)
+        while len(self.__items) > self.maxsize:
+            self.__items.popitem(last=False)
+
+def _memoized(*attributes):
+    '''
+    PURPOSE: This decorator caches an Analyzer method's return value and the public attributes it stores.
+    Entries are keyed by the method's arguments and the Analyzer's _version_key, so they are reused until the Game
+    is played again or a die's weights change. Error messages are never cached.
+
+    INPUTS:
+    attributes str names of the public attributes the method stores
+
+    OUTPUT:
+    Decorator
+    '''
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, tuple(sorted(kwargs.items())), self._version_key())
+            hit = self._cache.get(key)
+            if hit is not None:
+                value, stored = hit
+                for name, stored_value in stored.items():
+                    setattr(self, name, stored_value)
+                return value
+            value = method(self, *args, **kwargs)
+            if not isinstance(value, str):
+                self._cache.put(key, (value, {name: getattr(self, name) for name in attributes if hasattr(self, name)}))
+            return value
+        return wrapper
+    return decorator
+
+class RunStats:
+    """
+    A class to hold the per-stage measurements of one run of an instrumented method in a Monte Carlo simulator
+
+    ...
+
+    Attributes
+    ----------
+    method : str
+        Qualified name of the method, e.g. 'Game.play'
+    seconds : float
+        Wall time of the whole run
+    peak_bytes : int
+        Peak traced memory of the whole run (None unless memory tracing is enabled)
+    stages : list
+        One dict per stage with the stage name, seconds, rows processed, bytes of the arrays or dataframes produced
+        and peak traced memory (None unless memory tracing is enabled)
+
+    Methods
+    -------
+    as_dict():
+        Returns the measurements as plain Python types, e.g. to export to a metrics pipeline.
+    """
+    def __init__(self, method):
+        """
+        Constructs all the necessary attributes for the RunStats object.
+
+        INPUTS:
+        method : str
+        """
+        self.method = method
+        self.seconds = None
+        self.peak_bytes = None
+        self.stages = []
+        self._peak = 0
+        self._base = 0
+
+    def as_dict(self):
+        '''
+        PURPOSE: This method returns the measurements as plain Python types.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Dict
+        '''
+        return {'method': self.method, 'seconds': self.seconds, 'peak_bytes': self.peak_bytes, 'stages': [dict(s) for s in self.stages]}
+
+    def __repr__(self):
+        stages = ', '.join('{}={:.6f}s'.format(s['stage'], s['seconds']) for s in self.stages)
+        return 'RunStats({}: {:.6f}s; {})'.format(self.method, self.seconds or 0.0, stages)
+
+def instrument(enabled = True, callback = None, memory = False):
+    '''
+    PURPOSE: This function turns instrumentation of Die.roll, Game.play, Game.play_counts, Game.show and the Analyzer methods on or off.
+    While enabled, every run stores a RunStats in the object's last_run_stats attribute and is passed to callback.
+    While disabled, instrumented methods only check one module flag.
+
+    INPUTS:
+    enabled bool
+    callback None or callable taking a RunStats (called after every instrumented run)
+    memory bool (also trace peak memory with tracemalloc, which slows runs down)
+
+    OUTPUT:
+    None
+    '''
+    global _INSTRUMENTATION
+    _INSTRUMENTATION = {'callback': callback, 'memory': memory} if enabled else None
+
+def _note_peak():
+    '''
+    PURPOSE: This function records the traced memory peak so far in every instrumented run in progress,
+    so the peak can be reset for a new stage without losing it.
+
+    INPUTS:
+    None
+
+    OUTPUT:
+    Integer peak traced memory in bytes since the last reset
+    '''
+    peak = tracemalloc.get_traced_memory()[1]
+    for stats in getattr(_RUNS, 'stack', ()):
+        stats._peak = max(stats._peak, peak)
+    return peak
+
+def _instrumented(method):
+    '''
+    PURPOSE: This decorator records a RunStats for every run of a method while instrumentation is enabled.
+
+    INPUTS:
+    method function
+
+    OUTPUT:
+    Decorated function
+    '''
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        settings = _INSTRUMENTATION
+        if settings is None:
+            return method(self, *args, **kwargs)
+
+        stats = RunStats(type(self).__name__ + '.' + method.__name__)
+        stack = _RUNS.__dict__.setdefault('stack', [])
+        started_tracing = settings['memory'] and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            _note_peak()
+            tracemalloc.reset_peak()
+            stats._base = tracemalloc.get_traced_memory()[0]
+        stack.append(stats)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            stats.seconds = time.perf_counter() - start
+            if tracing:
+                _note_peak()
+                stats.peak_bytes = stats._peak - stats._base
+                if started_tracing:
+                    tracemalloc.stop()
+            stack.pop()
+            self.last_run_stats = stats
+            if settings['callback'] is not None:
+                settings['callback'](stats)
+    return wrapper
+
+class _NullStage:
+    """
+    A context manager standing in for _Stage while instrumentation is disabled. It does nothing.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def measure(self, value):
+        pass
+
+_NO_STAGE = _NullStage()
+
+class _Stage:
+    """
+    A context manager timing one stage of an instrumented run. The bytes produced can be measured before it exits.
+    """
+    def __init__(self, stats, name, rows):
+        self.stats = stats
+        self.name = name
+        self.rows = rows
+        self.bytes = None
+
+    def __enter__(self):
+        self.base = None
+        if tracemalloc.is_tracing():
+            _note_peak()
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def measure(self, value):
+        '''
+        PURPOSE: This method records the bytes held by the array or dataframe a stage produced,
+        and its length as the rows processed when they were not given.
+    
+        INPUTS: 
+        value array, dataframe or series
+    
+        OUTPUT:
+        None
+        '''
+        self.bytes = _size(value)
+        if self.rows is None:
+            self.rows = len(value)
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        peak = None if self.base is None else _note_peak() - self.base
+        self.stats.stages.append({'stage': self.name, 'seconds': seconds, 'rows': self.rows, 'bytes': self.bytes, 'peak_bytes': peak})
+        return False
+
+def _stage(name, rows = None):
+    '''
+    PURPOSE: This function opens a timed stage of the instrumented run in progress.
+
+    INPUTS:
+    name str
+    rows None or int (rows processed)
+
+    OUTPUT:
+    Context manager yielding a _Stage (or a _NullStage while instrumentation is disabled)
+    '''
+    if _INSTRUMENTATION is None:
+        return _NO_STAGE
+    stack = getattr(_RUNS, 'stack', None)
+    if not stack:
+        return _NO_STAGE
+    return _Stage(stack[-1], name, rows)
+
+def _size(value):
+    '''
+    PURPOSE: This function estimates the bytes held by an array, dataframe or series without inspecting Python objects.
+
+    INPUTS:
+    value array, dataframe or series
+
+    OUTPUT:
+    Integer number of bytes
+    '''
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=False).sum())
+    return int(value.memory_usage(index=False))
+
+@functools.lru_cache(maxsize=None)
+def _poisson_table():
+    '''
+    PURPOSE: This function builds a lookup table turning uniform 16-bit integers into Poisson(1) draws,
+    which is several times faster than drawing Poisson variates one by one. Probabilities are rounded to multiples
+    of 2**-16, which only drops draws above 8 (probability about 1e-6).
+
+    INPUTS:
+    None
+
+    OUTPUT:
+    Array (dtype uint8) of length 2**16
+    '''
+    k = np.arange(32)
+    probabilities = np.exp(-1.0) / np.cumprod(np.maximum(k, 1)).astype(float)
+    edges = np.round(np.cumsum(probabilities) * 2**16)
+    return np.searchsorted(edges, np.arange(2**16), side='right').astype(np.uint8)
+
+def _code_dtype(num_faces):
+    '''
+    PURPOSE: This function picks the smallest unsigned integer dtype able to hold face codes.
+
+    INPUTS:
+    num_faces int
+
+    OUTPUT:
+    NumPy dtype (uint8, uint16 or uint32)
+    '''
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if num_faces <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+def _global_lookup(face_tables):
+    '''
+    PURPOSE: This function maps every die's face codes onto one shared set of faces.
+
+    INPUTS:
+    face_tables list of per-die face arrays
+
+    OUTPUT:
+    Tuple of the sorted array of distinct faces and a list of per-die arrays mapping local codes to positions in it
+    '''
+    universe = np.unique(np.concatenate(face_tables))
+    lookups = [np.searchsorted(universe, faces) for faces in face_tables]
+    return universe, lookups
+
+def _die_groups(dice):
+    '''
+    PURPOSE: This function groups dice with identical faces and weights.
+
+    INPUTS:
+    dice list of Die objects
+
+    OUTPUT:
+    List of (Die, number of identical dice) tuples, in order of first appearance
+    '''
+    groups = {}
+    for c in dice:
+        key = (c.faces.dtype.str, c.faces.tobytes(), np.asarray(c.weights, dtype=float).tobytes())
+        if key in groups:
+            groups[key][1] += 1
+        else:
+            groups[key] = [c, 1]
+    return [tuple(group) for group in groups.values()]
+
+def _fill_counts(groups, lookups, out, seed_seq, block):
+    '''
+    PURPOSE: This function draws per-roll face counts for one block of plays, writing them in place.
+    Every group of identical dice is one multinomial draw per roll instead of one categorical draw per die.
+    A face listed more than once on a die is drawn once with the sum of its weights.
+
+    INPUTS:
+    groups list of (Die, number of identical dice) tuples built by _die_groups
+    lookups list of per-group arrays mapping codes of the dice's distinct faces (see Die._face_table) to positions in the shared set of faces
+    out array (view of shape block rolls by F faces, initialized to 0)
+    seed_seq SeedSequence of the play
+    block int (position of the block within the play)
+
+    OUTPUT:
+    None
+    '''
+    rng = _block_generator(seed_seq, block)
+    for (c, size), lookup in zip(groups, lookups):
+        p = np.asarray(c.weights, dtype=float)
+        remap = c._face_table()[1]
+        if remap is not None:
+            p = np.bincount(remap, weights=p, minlength=len(lookup))
+        out[:, lookup] += rng.multinomial(size, p / p.sum(), size=len(out)).astype(out.dtype)
 
 class Die:
     """
@@ -14,29 +732,44 @@ class Die:
         Array of die faces
     weights : array (dtype numeric)
         Array of weights associated with each face
+    rng : Generator
+        NumPy random Generator used when no seed is passed to roll
+    version : int
+        Counter bumped every time a weight changes
+    last_run_stats : RunStats
+        Measurements of the most recent roll while instrumentation is enabled (see instrument), otherwise None
     __df : dataframe 
-        Private dataframe built from faces and weights arrays
+        Private dataframe built from faces and weights arrays on request
+    __cdf : array (dtype float)
+        Private cached cumulative normalized weights used for sampling
+    __table : tuple
+        Private cached distinct faces and the map from face positions to them, see _face_table
 
     Methods
     -------
     change_weight(face_value, new_weight):
         Changes the weight of a single side.
-    roll(num_rolls=1):
+    roll(num_rolls=1, seed=None, codes=False, sampling='iid'):
         Rolls the die one or more times.
     show_current():
         Shows the user the die's current set of faces and weights.
     """
-    def __init__(self, faces):
+    def __init__(self, faces, seed=None):
         """
         Constructs all the necessary attributes for the Die object.
 
         INPUTS:
         faces : array (dtype string or numeric)
+        seed : None, int or Generator used to build the die's random Generator
         """
-        self.faces = faces
-        self.weights = np.tile(1,len(faces))
-        self.__df= pd.DataFrame({'faces':faces, 'weights':self.weights})
-
+        self.faces = np.asarray(faces)
+        self.weights = np.ones(len(faces))
+        self.rng = _as_generator(seed)
+        self.version = 0
+        self.last_run_stats = None
+        self.__df = None
+        self.__cdf = None
+        self.__table = None
 
     def change_weight(self, face_value, new_weight):
         '''
@@ -48,7 +781,7 @@ class Die:
     
         OUTPUT:
         Updates weight value to new weight in weights array attribute for a given face.
-        Updates weight value to new weight in faces & weights dataframe attribute for a given face.
+        Rebuilds the faces & weights dataframe attribute on the next request.
         Returns error message for invalid face or weight.
         '''
         #Check to see if weight passed is valid
@@ -63,28 +796,113 @@ class Die:
         if (face_value in self.faces):
             i, = np.where(self.faces == face_value)
             my_index = i[0]
-            self.__df.loc[my_index,'weights'] = new_weight
+            if self.weights[my_index] == new_weight:
+                return
             self.weights[my_index] = new_weight
+            self._weights_changed()
         else:
             error_message = "Please choose a valid face value."
             return error_message
 
-    def roll(self, num_rolls = 1):
+    def _face_table(self):
+        '''
+        PURPOSE: This method returns the die's distinct faces, in order of first appearance, which are the face table
+        game results are coded against. A face listed more than once gets a single code, so it shows, counts and
+        combines as one face.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Tuple of the array of distinct faces and an array mapping every position in faces to its code,
+        or None when every face is distinct
+        '''
+        if self.__table is None:
+            distinct, first, inverse = np.unique(self.faces, return_index=True, return_inverse=True)
+            if len(distinct) == len(self.faces):
+                self.__table = (self.faces.copy(), None)
+            else:
+                order = np.argsort(first)
+                codes = np.empty(len(order), dtype=np.intp)
+                codes[order] = np.arange(len(order))
+                self.__table = (distinct[order], codes[inverse.reshape(-1)])
+        return self.__table
+
+    def _weights_changed(self):
+        '''
+        PURPOSE: This method marks the sampling table and dataframe as stale after the weights array changed,
+        so they are rebuilt when next needed, and bumps the version.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        None
+        '''
+        self.__cdf = None
+        self.__df = None
+        self.version += 1
+
+    def _cdf(self):
+        '''
+        PURPOSE: This method returns the cumulative normalized weights used for sampling.
+        The table is cached and only rebuilt after a weight has changed.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Array (dtype float) of cumulative weights ending in 1.0
+        '''
+        if self.__cdf is None:
+            cdf = np.cumsum(self.weights, dtype=float)
+            self.__cdf = cdf / cdf[-1]
+        return self.__cdf
+
+    def _codes_from_uniform(self, u):
+        '''
+        PURPOSE: This method maps uniform draws on [0, 1) to face codes by inverse-CDF lookup.
+    
+        INPUTS: 
+        u array (dtype float)
+    
+        OUTPUT:
+        Array (dtype int) of face codes, i.e. positions in the faces array
+        '''
+        return _inverse_cdf(self._cdf(), u)
+
+    @_instrumented
+    def roll(self, num_rolls = 1, seed = None, codes = False, sampling = 'iid'):
         '''
         PURPOSE: This method rolls the die one or more times.
     
         INPUTS: 
         num_rolls int 
+        seed None, int or Generator (defaults to the die's own Generator)
+        codes bool (return face codes instead of faces)
+        sampling str ('iid', 'stratified' or 'antithetic')
     
         OUTPUT:
-        Returns a random sample from the vector of faces according to the weights with specified length.
+        Returns an array of random samples from the vector of faces according to the weights with specified length.
+        Returns error message for invalid sampling.
         '''
-        randomList = random.choices(self.faces, self.weights, k=num_rolls)
-        return randomList
+        if sampling not in _SAMPLINGS:
+            return "Not a valid sampling. Try again."
+        rng = self.rng if seed is None else _as_generator(seed)
+        with _stage('sample', num_rolls) as stage:
+            face_codes = self._codes_from_uniform(_uniforms(rng, num_rolls, sampling))
+            stage.measure(face_codes)
+        if codes:
+            return face_codes
+        with _stage('decode', num_rolls) as stage:
+            faces = self.faces[face_codes]
+            stage.measure(faces)
+        return faces
 
     def show_current(self):
         '''
         PURPOSE: This method shows the user the die's current set of faces and weights.
+        The dataframe is built on request and cached until a weight changes.
     
         INPUTS: 
         None
@@ -92,92 +910,1148 @@ class Die:
         OUTPUT:
         Dataframe
         '''
+        if self.__df is None:
+            self.__df = pd.DataFrame({'faces': self.faces, 'weights': self.weights.copy()})
         return self.__df
-    
-    
-class Game:
+
+
+def _fenwick_build(weights):
+    '''
+    PURPOSE: This function builds a Fenwick (binary indexed) tree of weights from their cumulative sums.
+    Node i (1-based) holds the sum of the i & -i weights ending at position i.
+    The tree is padded with infinite nodes up to a power of two, so searches never step outside it.
+
+    INPUTS:
+    weights array (dtype float)
+
+    OUTPUT:
+    Array (dtype float) of length 2**k > F, node 0 unused
+    '''
+    size = len(weights)
+    cumulative = np.concatenate(([0.0], np.cumsum(weights, dtype=float)))
+    nodes = np.arange(1, size + 1)
+    tree = np.full(1 << size.bit_length(), np.inf)
+    tree[0] = 0.0
+    tree[1:size+1] = cumulative[nodes] - cumulative[nodes - (nodes & -nodes)]
+    return tree
+
+def _fenwick_add(tree, size, positions, deltas):
+    '''
+    PURPOSE: This function adds deltas to the weights at positions, updating O(log F) nodes per position.
+    All positions climb the tree together, one level per step.
+
+    INPUTS:
+    tree array built by _fenwick_build
+    size int (number of weights F)
+    positions array (dtype int) of 0-based positions
+    deltas array (dtype float)
+
+    OUTPUT:
+    None
+    '''
+    nodes = np.asarray(positions, dtype=np.int64) + 1
+    deltas = np.asarray(deltas, dtype=float)
+    while len(nodes):
+        np.add.at(tree, nodes, deltas)
+        nodes = nodes + (nodes & -nodes)
+        keep = nodes <= size
+        nodes, deltas = nodes[keep], deltas[keep]
+
+def _fenwick_total(tree, size):
+    '''
+    PURPOSE: This function adds up all weights held by a Fenwick tree in O(log F).
+
+    INPUTS:
+    tree array built by _fenwick_build
+    size int (number of weights F)
+
+    OUTPUT:
+    Float
+    '''
+    total = 0.0
+    while size:
+        total += tree[size]
+        size -= size & -size
+    return total
+
+def _fenwick_search(tree, size, targets):
+    '''
+    PURPOSE: This function finds, for every target, the first position whose cumulative weight exceeds it,
+    descending the tree one level per step for all targets together.
+
+    INPUTS:
+    tree array built by _fenwick_build
+    size int (number of weights F)
+    targets array (dtype float) between 0 and the total weight
+
+    OUTPUT:
+    Array (dtype int64) of 0-based positions
+    '''
+    positions = np.zeros(len(targets), dtype=np.int64)
+    remaining = np.array(targets, dtype=float)
+    step = len(tree) >> 1
+    while step:
+        values = tree[positions + step]
+        move = values <= remaining
+        remaining -= np.where(move, values, 0.0)
+        positions += move * step
+        step >>= 1
+    #Rounding can push a target past the last node
+    return np.minimum(positions, size - 1)
+
+
+class LargeDie(Die):
     """
-    A class to represent a Game in a Monte Carlo simulator
+    A class to represent a Die with a very large number of faces in a Monte Carlo simulator.
+    Weights are kept in a Fenwick tree, so changing a weight and rolling a face cost O(log F) instead of O(F).
 
     ...
 
     Attributes
     ----------
-    DieList : list
-        List of already instantiated similar Die objects
-    __game_df : dataframe
-        Private dataframe of shape N rolls by M dice
-    game_df_wide : dataframe
-        Game results in wide form as an attribute.
-    game_df_narrow : dataframe
-        Game results in narrow form as an attribute.
+    faces : array (dtype string or numeric)
+        Array of die faces
+    weights : array (dtype float)
+        Array of weights associated with each face
+    rng : Generator
+        NumPy random Generator used when no seed is passed to roll
+    version : int
+        Counter bumped every time a weight changes
+    last_run_stats : RunStats
+        Measurements of the most recent roll while instrumentation is enabled (see instrument), otherwise None
+    index : dict
+        Position of every face in the faces array
+    __tree : array (dtype float)
+        Private Fenwick tree of the weights
 
     Methods
     -------
-    play(num_plays):
-        Plays a game (i.e., rolls all of the dice a given number of times)
-    show(form='wide')
-        Shows the user the results of the most recent play in narrow or wide form.
+    change_weight(face_value, new_weight):
+        Changes the weight of a single side.
+    change_weights(mapping):
+        Changes the weights of many sides at once.
+    roll(num_rolls=1, seed=None, codes=False, sampling='iid'):
+        Rolls the die one or more times.
+    show_current():
+        Shows the user the die's current set of faces and weights.
     """
-    def __init__(self, DieList):
+    def __init__(self, faces, weights=None, seed=None):
         """
-        Constructs all the necessary attributes for the Game object.
+        Constructs all the necessary attributes for the LargeDie object.
 
         INPUTS:
-        DieList : list of already instantiated similar Die objects
+        faces : array (dtype string or numeric)
+        weights : None or array (dtype numeric) aligned with faces (defaults to all ones)
+        seed : None, int or Generator used to build the die's random Generator
         """
-        self.DieList = DieList
+        super().__init__(faces, seed)
+        if weights is not None:
+            self.weights = np.array(weights, dtype=float)
+        self.index = {face: i for i, face in enumerate(self.faces.tolist())}
+        self.__tree = _fenwick_build(self.weights)
 
-    def play(self, num_plays):
+    def change_weight(self, face_value, new_weight):
         '''
-        PURPOSE: This method plays a game (i.e., rolls all of the dice a given number of times)
+        PURPOSE: This method changes the weight of a single side.
     
         INPUTS: 
-        num_plays int
+        face_value str or numeric
+        new_weight numeric 
     
         OUTPUT:
-        Saves results to a private dataframe of shape N rolls by M dice
+        Updates weight value to new weight in weights array attribute for a given face.
+        Returns error message for invalid face or weight.
         '''
-        self.__game_df = pd.DataFrame()
-        i = 1
-
-        #Build matrix of shape N rolls by M dice
-        for c in self.DieList:
-            i_str = str(i)
-            self.__game_df['Die ' + i_str] = c.roll(num_plays)
-            i = i+1
-
-        #Build roll # column and set as index
-        game_roll_list = list(range(1,len(self.__game_df['Die 1'])+1))
-        self.__game_df['roll #'] = game_roll_list
-        self.__game_df = self.__game_df.set_index('roll #')
+        return self.change_weights({face_value: new_weight})
 
-    def show(self, form = 'wide'):
+    def change_weights(self, mapping):
         '''
-        PURPOSE: This method shows the user the results of the most recent play. 
-        It passes the private dataframe created in the play method to the user.
+        PURPOSE: This method changes the weights of many sides at once. Nothing is changed if any face or weight is invalid.
     
         INPUTS: 
-        form str ('wide' or 'narrow')
+        mapping dict of face value to new weight
     
         OUTPUT:
-        Returns a dataframe in narrow or wide form depending on chosen parameter.
-        Also creates public attributes for wide and narrow dataframes. 
+        Updates weight values to new weights in weights array attribute.
+        Returns error message for invalid face or weight.
         '''
-        #Build wide and narrow forms as attributes. Return one or the other depending on parameter chosen by user.
-        self.game_df_wide = self.__game_df
-        self.game_df_narrow = self.game_df_wide.stack()
-        if form.lower() == 'wide':
-            return self.game_df_wide
-        elif form.lower() == 'narrow':
-            return self.game_df_narrow
-        else:
-            return "Not a valid form. Try again."
+        positions = []
+        new_weights = []
+        for face_value, new_weight in mapping.items():
+            try:
+                weight = float(new_weight)
+            except (TypeError, ValueError):
+                return "Not a valid weight. Try again"
+            if not weight >= 0:
+                return "Not a valid weight. Try again"
+            if face_value not in self.index:
+                return "Please choose a valid face value."
+            positions.append(self.index[face_value])
+            new_weights.append(weight)
 
+        positions = np.array(positions, dtype=np.int64)
+        new_weights = np.array(new_weights)
+        #Keep the last weight given for a face, and skip faces whose weight does not change
+        positions, last = np.unique(positions[::-1], return_index=True)
+        new_weights = new_weights[::-1][last]
+        changed = self.weights[positions] != new_weights
+        if not changed.any():
+            return
+        positions, new_weights = positions[changed], new_weights[changed]
+        _fenwick_add(self.__tree, len(self.faces), positions, new_weights - self.weights[positions])
+        self.weights[positions] = new_weights
+        self._weights_changed()
 
-class Analyzer:
-    """
-    A class to analyze the results of a single game and compute various descriptive statistics in a Monte Carlo simulator
+    def _cdf(self):
+        '''
+        PURPOSE: This method is kept for compatibility with Die. The Fenwick tree is always up to date, so there is nothing to build.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        None
+        '''
+        return None
+
+    def _codes_from_uniform(self, u):
+        '''
+        PURPOSE: This method maps uniform draws on [0, 1) to face codes by searching the Fenwick tree.
+    
+        INPUTS: 
+        u array (dtype float)
+    
+        OUTPUT:
+        Array (dtype int) of face codes, i.e. positions in the faces array
+        '''
+        size = len(self.faces)
+        return _fenwick_search(self.__tree, size, np.asarray(u) * _fenwick_total(self.__tree, size))
+
+
+def _make_die(faces, weights = None, large = False):
+    '''
+    PURPOSE: This function builds a die with all its weights at once, without one change_weight call per face,
+    so restoring saved or configured dice stays linear in the number of faces.
+
+    INPUTS:
+    faces array (dtype string or numeric)
+    weights None or array (dtype numeric) aligned with faces (defaults to all ones)
+    large bool (build a LargeDie)
+
+    OUTPUT:
+    Die or LargeDie object
+    '''
+    if large:
+        return LargeDie(faces, weights)
+    die = Die(faces)
+    if weights is not None:
+        die.weights = np.array(weights, dtype=float)
+    return die
+
+
+class Game:
+    """
+    A class to represent a Game in a Monte Carlo simulator
+
+    ...
+
+    Attributes
+    ----------
+    DieList : list
+        List of already instantiated similar Die objects
+    seed_sequence : SeedSequence
+        NumPy SeedSequence a new seed is spawned from when no seed is passed to play
+    last_seed : SeedSequence
+        SeedSequence of the stored results (set by play, play_counts, play_async and load, not by streamed plays)
+    path : str
+        Results directory the most recent play was saved to or loaded from, otherwise None
+    version : int
+        Counter bumped every time new results are played or loaded
+    last_run_stats : RunStats
+        Measurements of the most recent play or show while instrumentation is enabled (see instrument), otherwise None
+    __results : array (dtype uint8 or uint16)
+        Private face-code matrix of shape N rolls by M dice
+    __weights : array (dtype float)
+        Private per-play sample weights of the most recent importance sampled play, otherwise None
+    __counts : array (dtype unsigned int)
+        Private face-count matrix of shape N rolls by F faces of the most recent counts-only play, otherwise None
+    __count_faces : array
+        Private sorted array of faces matching the columns of the face-count matrix
+    __face_tables : list
+        Private list of per-die face arrays used to decode the face-code matrix
+    __wide : dataframe
+        Private cached wide form of the most recent play
+    __narrow : series
+        Private cached narrow form of the most recent play
+    game_df_wide : dataframe
+        Game results in wide form as an attribute.
+    game_df_narrow : dataframe
+        Game results in narrow form as an attribute.
+
+    Methods
+    -------
+    play(num_plays, seed=None, workers=1, executor='thread', sampling='iid', proposal=None):
+        Plays a game (i.e., rolls all of the dice a given number of times)
+    play_stream(num_plays, chunk_size, seed=None):
+        Plays a game chunk by chunk, yielding face-code matrices instead of storing them.
+    play_counts(num_plays, seed=None):
+        Plays a game keeping only how many times each face is rolled in each roll.
+    play_async(num_plays, seed=None, chunk_size, progress=None):
+        Plays a game chunk by chunk on the shared async pool without blocking the event loop.
+    show(form='wide')
+        Shows the user the results of the most recent play in narrow or wide form.
+    show_codes():
+        Shows the user the face-code matrix and face lookup tables of the most recent play.
+    show_weights():
+        Shows the user the per-play sample weights of the most recent play.
+    show_counts():
+        Shows the user the face-count matrix and faces of the most recent counts-only play.
+    save(path):
+        Saves the results of the most recent play to a results directory.
+    load(path):
+        Opens a saved results directory as a Game without reading the face codes into memory.
+    """
+    def __init__(self, DieList, seed=None):
+        """
+        Constructs all the necessary attributes for the Game object.
+
+        INPUTS:
+        DieList : list of already instantiated similar Die objects
+        seed : None, int, SeedSequence or Generator used to seed the game's plays
+        """
+        self.DieList = DieList
+        self.seed_sequence = _as_seed_sequence(seed)
+        self.last_seed = None
+        self.path = None
+        self.version = 0
+        self.last_run_stats = None
+        self.__results = None
+        self.__weights = None
+        self.__counts = None
+        self.__count_faces = None
+        self.__face_tables = None
+        self.__wide = None
+        self.__narrow = None
+
+    @_instrumented
+    def play(self, num_plays, seed = None, workers = 1, executor = 'thread', sampling = 'iid', proposal = None, path = None):
+        '''
+        PURPOSE: This method plays a game (i.e., rolls all of the dice a given number of times)
+        Every block of plays has its own random stream, so results for a given seed do not depend on the number of workers.
+        Variance reduction: 'stratified' (or 'lhs') stratifies every die's draws and shuffles them independently,
+        which is a Latin hypercube across dice; 'antithetic' pairs every play with a mirrored play.
+        Importance sampling: dice are rolled from the proposal weights and every play gets a sample weight
+        (its likelihood ratio), which Analyzer uses to keep jackpot and combo counts unbiased.
+    
+        INPUTS: 
+        num_plays int
+        seed None, int, SeedSequence or Generator (defaults to a seed spawned from the game's seed_sequence)
+        workers int (number of parallel workers)
+        executor str ('thread' or 'process')
+        sampling str ('iid', 'stratified', 'lhs' or 'antithetic')
+        proposal None or list of weights arrays, one per die and aligned with its faces
+        path None or str (results directory the face codes are written to block by block, see save)
+    
+        OUTPUT:
+        Saves results to a private face-code matrix of shape N rolls by M dice (memory-mapped from path when given)
+        Saves sample weights to a private array when a proposal is used
+        Returns error message for invalid executor, sampling or proposal.
+        '''
+        if sampling not in _SAMPLINGS:
+            return "Not a valid sampling. Try again."
+        tables = None if proposal is None else _proposal_tables(self.DieList, proposal)
+        if proposal is not None and tables is None:
+            return "Not a valid proposal. Try again."
+        pool = _make_pool(executor, workers) if workers > 1 else None
+        if workers > 1 and pool is None:
+            return "Not a valid executor. Try again."
+
+        seed_seq = self._start(seed)
+        self.__face_tables = _face_tables(self.DieList)
+        dtype = _code_dtype(max(len(t) for t in self.__face_tables))
+        if path is None:
+            results = np.empty((num_plays, len(self.DieList)), dtype=dtype)
+        else:
+            results = _open_codes(path, (num_plays, len(self.DieList)), dtype)
+        weights = None if tables is None else np.ones(num_plays)
+
+        def fill(block):
+            rows = slice(block*_BLOCK_SIZE, (block+1)*_BLOCK_SIZE)
+            _fill_block(self.DieList, results[rows], seed_seq, block, sampling, tables, None if weights is None else weights[rows])
+
+        with _stage('sample', num_plays) as stage:
+            #Fill a preallocated matrix of shape N rolls by M dice one block of plays at a time
+            if pool is None:
+                for block in range(-(-num_plays // _BLOCK_SIZE)):
+                    fill(block)
+            elif executor == 'thread':
+                #Threads write straight into the shared matrix. Build sampling tables first so workers only read them.
+                for c in self.DieList:
+                    c._cdf()
+                with pool:
+                    list(pool.map(fill, range(-(-num_plays // _BLOCK_SIZE))))
+            else:
+                #Processes send back their range of rows, which is copied into place in block order
+                with pool:
+                    ranges = _split_blocks(num_plays, workers)
+                    futures = [pool.submit(_play_blocks, self.DieList, seed_seq, first, stop, num_plays, dtype, sampling, tables)
+                               for first, stop in ranges]
+                    for (first, stop), future in zip(ranges, futures):
+                        part, part_weights = future.result()
+                        rows = slice(first*_BLOCK_SIZE, first*_BLOCK_SIZE+len(part))
+                        results[rows] = part
+                        if weights is not None:
+                            weights[rows] = part_weights
+            stage.measure(results)
+        self.last_seed = seed_seq
+        self.__results = results
+        self.__weights = weights
+        self.__counts = None
+        self.__count_faces = None
+        self.version += 1
+        self.path = None
+        if path is not None:
+            with _stage('save', num_plays):
+                results.flush()
+                self.save(path)
+
+        #Views of the previous play are stale now
+        self._drop_views()
+
+    def play_stream(self, num_plays, chunk_size = _BLOCK_SIZE, seed = None):
+        '''
+        PURPOSE: This method plays a game chunk by chunk so that runs larger than memory can be analyzed.
+        Chunks are rounded up to a whole number of blocks of plays, so for the same seed the concatenated chunks
+        equal the face-code matrix saved by play.
+    
+        INPUTS: 
+        num_plays int
+        chunk_size int (number of plays per chunk)
+        seed None, int, SeedSequence or Generator (defaults to a seed spawned from the game's seed_sequence)
+    
+        OUTPUT:
+        Yields face-code matrices of shape chunk rolls by M dice. The buffer is reused between chunks.
+        '''
+        seed_seq = self._start(seed)
+        dtype = _code_dtype(max(len(c.faces) for c in self.DieList))
+        blocks_per_chunk = max(1, -(-chunk_size // _BLOCK_SIZE))
+        buffer = np.empty((blocks_per_chunk * _BLOCK_SIZE, len(self.DieList)), dtype=dtype)
+
+        block = 0
+        for chunk_start in range(0, num_plays, len(buffer)):
+            chunk = buffer[:min(len(buffer), num_plays - chunk_start)]
+            for start in range(0, len(chunk), _BLOCK_SIZE):
+                _fill_block(self.DieList, chunk[start:start+_BLOCK_SIZE], seed_seq, block)
+                block += 1
+            yield chunk
+
+    @_instrumented
+    def play_counts(self, num_plays, seed = None):
+        '''
+        PURPOSE: This method plays a game keeping only how many times each face is rolled in each roll.
+        Dice with identical faces and weights are grouped and every group is rolled with one multinomial draw per roll,
+        so the cost grows with the number of faces instead of the number of dice.
+        Face counts, jackpots and unordered combos can be analyzed from the results; which die rolled which face cannot.
+    
+        INPUTS: 
+        num_plays int
+        seed None, int, SeedSequence or Generator (defaults to a seed spawned from the game's seed_sequence)
+    
+        OUTPUT:
+        Saves results to a private face-count matrix of shape N rolls by F faces
+        '''
+        seed_seq = self._start(seed)
+        self.__face_tables = _face_tables(self.DieList)
+        groups = _die_groups(self.DieList)
+        faces, lookups = _global_lookup([c._face_table()[0] for c, size in groups])
+        with _stage('sample', num_plays) as stage:
+            counts = np.zeros((num_plays, len(faces)), dtype=_code_dtype(len(self.DieList) + 1))
+            for block in range(-(-num_plays // _BLOCK_SIZE)):
+                _fill_counts(groups, lookups, counts[block*_BLOCK_SIZE:(block+1)*_BLOCK_SIZE], seed_seq, block)
+            stage.measure(counts)
+
+        self.last_seed = seed_seq
+        self.__counts = counts
+        self.__count_faces = faces
+        self.__results = None
+        self.__weights = None
+        self.version += 1
+        self.path = None
+        self._drop_views()
+
+    async def play_async(self, num_plays, seed = None, chunk_size = 1 << 18, progress = None):
+        '''
+        PURPOSE: This method plays a game without blocking the event loop. Chunks of plays run on the shared async_pool
+        and the event loop is free between chunks. Results for a given seed match play.
+        If the task is cancelled, the game keeps the results of its previous play.
+    
+        INPUTS: 
+        num_plays int
+        seed None, int, SeedSequence or Generator (defaults to a seed spawned from the game's seed_sequence)
+        chunk_size int (plays per chunk, rounded up to whole blocks of plays)
+        progress None or callable taking the number of plays done and the total (called after every chunk)
+    
+        OUTPUT:
+        Saves results to a private face-code matrix of shape N rolls by M dice
+        '''
+        #Imported here, as only async callers need it
+        import asyncio
+        loop = asyncio.get_running_loop()
+        seed_seq = self._start(seed)
+        dice = list(self.DieList)
+        face_tables = _face_tables(dice)
+        results = np.empty((num_plays, len(dice)), dtype=_code_dtype(max(len(t) for t in face_tables)))
+        #Build sampling tables first so workers only read them
+        for c in dice:
+            c._cdf()
+
+        def fill(first, stop):
+            for block in range(first, stop):
+                _fill_block(dice, results[block*_BLOCK_SIZE:(block+1)*_BLOCK_SIZE], seed_seq, block)
+
+        blocks = -(-num_plays // _BLOCK_SIZE)
+        blocks_per_chunk = max(1, -(-chunk_size // _BLOCK_SIZE))
+        for first in range(0, blocks, blocks_per_chunk):
+            stop = min(first + blocks_per_chunk, blocks)
+            await _run_async(loop, fill, first, stop)
+            if progress is not None:
+                progress(min(stop * _BLOCK_SIZE, num_plays), num_plays)
+
+        self.last_seed = seed_seq
+        self.__face_tables = face_tables
+        self.__results = results
+        self.__weights = None
+        self.__counts = None
+        self.__count_faces = None
+        self.version += 1
+        self.path = None
+        self._drop_views()
+
+    def _start(self, seed):
+        '''
+        PURPOSE: This method picks the SeedSequence of a new play. Only methods that store results record it as last_seed,
+        so last_seed always replays the stored results.
+    
+        INPUTS: 
+        seed None, int, SeedSequence or Generator
+    
+        OUTPUT:
+        SeedSequence
+        '''
+        if seed is None:
+            return self.seed_sequence.spawn(1)[0]
+        return _as_seed_sequence(seed)
+
+    @_instrumented
+    def show(self, form = 'wide'):
+        '''
+        PURPOSE: This method shows the user the results of the most recent play. 
+        Dataframes are built from the private face-code matrix on first request and cached until the next play.
+    
+        INPUTS: 
+        form str ('wide' or 'narrow')
+    
+        OUTPUT:
+        Returns a dataframe in narrow or wide form depending on chosen parameter.
+        Also creates public attributes for wide and narrow dataframes. 
+        '''
+        form = form.lower()
+        if form not in ('wide', 'narrow'):
+            return "Not a valid form. Try again."
+        if self.__results is None and self.__counts is not None:
+            return "Only face counts were played. Try play() for full results."
+
+        #Build wide form with one categorical column per die, indexed by roll #
+        if self.__wide is None:
+            with _stage('wide', len(self.__results)) as stage:
+                columns = {}
+                for j, faces in enumerate(self.__face_tables):
+                    columns['Die ' + str(j+1)] = pd.Categorical.from_codes(self.__results[:, j], categories=faces)
+                index = pd.RangeIndex(1, len(self.__results)+1, name='roll #')
+                self.__wide = pd.DataFrame(columns, index=index)
+                stage.measure(self.__wide)
+        self.game_df_wide = self.__wide
+
+        if form == 'wide':
+            return self.game_df_wide
+        if self.__narrow is None:
+            with _stage('narrow', self.__wide.size) as stage:
+                self.__narrow = self.__wide.stack()
+                stage.measure(self.__narrow)
+        self.game_df_narrow = self.__narrow
+        return self.game_df_narrow
+
+    def show_codes(self):
+        '''
+        PURPOSE: This method shows the user the integer-coded results of the most recent play.
+        Entry [i, j] is the position of the face rolled by die j on roll i in that die's face table.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Tuple of the face-code matrix of shape N rolls by M dice and the list of per-die face arrays
+        '''
+        return self.__results, self.__face_tables
+
+    def show_weights(self):
+        '''
+        PURPOSE: This method shows the user the per-play sample weights of the most recent play.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Array (dtype float) of likelihood ratios for an importance sampled play, otherwise None
+        '''
+        return self.__weights
+
+    def show_counts(self):
+        '''
+        PURPOSE: This method shows the user the face counts of the most recent counts-only play.
+        Entry [i, k] is how many dice rolled face k on roll i.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Tuple of the face-count matrix of shape N rolls by F faces and the sorted array of faces, or (None, None)
+        when the most recent play was not counts-only
+        '''
+        return self.__counts, self.__count_faces
+
+    def save(self, path):
+        '''
+        PURPOSE: This method saves the results of the most recent play to a results directory:
+        the face-code matrix (codes.npy), the sample weights if any (weights.npy), and the face tables,
+        die weights and kinds, seed and number of plays (meta.json).
+    
+        INPUTS: 
+        path str
+    
+        OUTPUT:
+        Writes the results directory. Sets the path attribute.
+        Returns error message after a counts-only play.
+        '''
+        if self.__results is None and self.__counts is not None:
+            return "Only face counts were played. Try play() for full results."
+        os.makedirs(path, exist_ok=True)
+        codes_file = os.path.join(path, _CODES_FILE)
+        if not (isinstance(self.__results, np.memmap) and os.path.abspath(self.__results.filename) == os.path.abspath(codes_file)):
+            np.save(codes_file, self.__results)
+        weights_file = os.path.join(path, _WEIGHTS_FILE)
+        if self.__weights is not None:
+            np.save(weights_file, self.__weights)
+        elif os.path.exists(weights_file):
+            os.remove(weights_file)
+
+        meta = {'num_plays': len(self.__results),
+                'faces': [t.tolist() for t in self.__face_tables],
+                'face_dtypes': [t.dtype.str for t in self.__face_tables],
+                'weights': [c.weights.tolist() for c in self.DieList],
+                'large': [isinstance(c, LargeDie) for c in self.DieList],
+                'die_faces': [None if len(c.faces) == len(t) else c.faces.tolist() for c, t in zip(self.DieList, self.__face_tables)],
+                'seed': None if self.last_seed is None else _seed_meta(self.last_seed)}
+        with open(os.path.join(path, _META_FILE), 'w') as f:
+            json.dump(meta, f)
+        self.path = path
+
+    @classmethod
+    def load(cls, path):
+        '''
+        PURPOSE: This method opens a saved results directory as a Game. The face codes and sample weights are
+        memory-mapped read-only, so results larger than memory can be analyzed and shared between processes.
+    
+        INPUTS: 
+        path str
+    
+        OUTPUT:
+        Game object with the saved dice, seed and results
+        '''
+        with open(os.path.join(path, _META_FILE)) as f:
+            meta = json.load(f)
+        large = meta.get('large', [False] * len(meta['faces']))
+        #Dice listing a face more than once keep their own faces, the face tables hold each face once
+        die_faces = [table if faces is None else faces for table, faces in zip(meta['faces'], meta.get('die_faces', meta['faces']))]
+        dice = [_make_die(np.array(faces, dtype=dtype), weights, is_large)
+                for faces, dtype, weights, is_large in zip(die_faces, meta['face_dtypes'], meta['weights'], large)]
+
+        game = cls(dice)
+        game.__results = _load_codes(path)
+        game.__face_tables = [np.array(faces, dtype=dtype) for faces, dtype in zip(meta['faces'], meta['face_dtypes'])]
+        weights_file = os.path.join(path, _WEIGHTS_FILE)
+        game.__weights = np.load(weights_file, mmap_mode='r') if os.path.exists(weights_file) else None
+        if meta['seed'] is not None:
+            game.last_seed = np.random.SeedSequence(meta['seed']['entropy'], spawn_key=tuple(meta['seed']['spawn_key']))
+        game.path = path
+        game.version += 1
+        return game
+
+    def _drop_views(self):
+        '''
+        PURPOSE: This method drops the cached dataframes of the previous play, along with the public
+        game_df_wide and game_df_narrow attributes when they still point to them. A dataframe assigned by the user is kept.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        None
+        '''
+        if self.__wide is not None and getattr(self, 'game_df_wide', None) is self.__wide:
+            del self.game_df_wide
+        if self.__narrow is not None and getattr(self, 'game_df_narrow', None) is self.__narrow:
+            del self.game_df_narrow
+        self.__wide = None
+        self.__narrow = None
+
+    def _owns(self, frame):
+        '''
+        PURPOSE: This method checks whether a dataframe is the game's own cached wide form.
+    
+        INPUTS: 
+        frame dataframe
+    
+        OUTPUT:
+        Boolean
+        '''
+        return frame is self.__wide
+
+
+class JackpotAccumulator:
+    """
+    A class to keep a running count of jackpots over chunks of game results in a Monte Carlo simulator
+
+    ...
+
+    Attributes
+    ----------
+    lookups : list
+        List of per-die arrays mapping face codes to a shared set of faces
+    count : int or float
+        Number of jackpots seen so far (sum of sample weights of jackpot rolls for weighted chunks)
+    plays : int
+        Number of plays seen so far
+
+    Methods
+    -------
+    update(codes, weights=None):
+        Adds a chunk of face codes to the running count.
+    hits(codes):
+        Flags the rolls in a chunk where every die shows the same face.
+    merge(other):
+        Adds the running count of another accumulator.
+    """
+    def __init__(self, face_tables):
+        """
+        Constructs all the necessary attributes for the JackpotAccumulator object.
+
+        INPUTS:
+        face_tables : list of per-die face arrays
+        """
+        universe, self.lookups = _global_lookup(face_tables)
+        self.count = 0
+        self.plays = 0
+
+    def update(self, codes, weights = None):
+        '''
+        PURPOSE: This method adds a chunk of face codes to the running count.
+    
+        INPUTS: 
+        codes array of shape chunk rolls by M dice
+        weights None or array (dtype float) of per-play sample weights
+    
+        OUTPUT:
+        None
+        '''
+        if weights is None:
+            self.count += int(self.hits(codes).sum())
+        else:
+            self.count += float(np.sum(weights, where=self.hits(codes)))
+        self.plays += len(codes)
+
+    def hits(self, codes):
+        '''
+        PURPOSE: This method flags the rolls in a chunk where every die shows the same face.
+    
+        INPUTS: 
+        codes array of shape chunk rolls by M dice
+    
+        OUTPUT:
+        Boolean array with one entry per roll
+        '''
+        first = self.lookups[0][codes[:, 0]]
+        hits = np.ones(len(codes), dtype=bool)
+        for j in range(1, codes.shape[1]):
+            hits &= self.lookups[j][codes[:, j]] == first
+        return hits
+
+    def merge(self, other):
+        '''
+        PURPOSE: This method adds the running count of another accumulator.
+    
+        INPUTS: 
+        other JackpotAccumulator
+    
+        OUTPUT:
+        None
+        '''
+        self.count += other.count
+        self.plays += other.plays
+
+
+class ComboAccumulator:
+    """
+    A class to keep a running histogram of face combinations over chunks of game results in a Monte Carlo simulator
+
+    ...
+
+    Attributes
+    ----------
+    face_tables : list
+        List of per-die face arrays used to decode combinations
+    radices : list
+        Number of faces of each die, used to pack a combination into one integer key
+    keys : array
+        Sorted distinct combination keys seen so far (rows of face codes when the keys would overflow)
+    counts : array (dtype int or float)
+        Number of times each key was seen so far (sum of sample weights for weighted chunks)
+
+    Methods
+    -------
+    update(codes, weights=None):
+        Adds a chunk of face codes to the histogram.
+    merge(other):
+        Adds the histogram of another accumulator.
+    rows():
+        Decodes the distinct keys back to rows of face codes.
+    """
+    def __init__(self, face_tables):
+        """
+        Constructs all the necessary attributes for the ComboAccumulator object.
+
+        INPUTS:
+        face_tables : list of per-die face arrays
+        """
+        self.face_tables = face_tables
+        self.radices = [len(t) for t in face_tables]
+        self.keys = _row_keys(np.empty((0, len(face_tables)), dtype=np.int64), self.radices)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def update(self, codes, weights = None):
+        '''
+        PURPOSE: This method adds a chunk of face codes to the histogram.
+    
+        INPUTS: 
+        codes array of shape chunk rolls by M dice
+        weights None or array (dtype float) of per-play sample weights
+    
+        OUTPUT:
+        None
+        '''
+        keys, counts = _unique_counts(_row_keys(codes, self.radices), weights)
+        self._add(keys, counts)
+
+    def merge(self, other):
+        '''
+        PURPOSE: This method adds the histogram of another accumulator.
+    
+        INPUTS: 
+        other ComboAccumulator
+    
+        OUTPUT:
+        None
+        '''
+        self._add(other.keys, other.counts)
+
+    def rows(self):
+        '''
+        PURPOSE: This method decodes the distinct keys back to rows of face codes.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Array of shape K combinations by M dice, in key order
+        '''
+        return _key_rows(self.keys, self.radices)
+
+    def _add(self, keys, counts):
+        '''
+        PURPOSE: This method merges distinct keys and their counts into the histogram.
+    
+        INPUTS: 
+        keys array
+        counts array (dtype int or float)
+    
+        OUTPUT:
+        None
+        '''
+        merged, totals = _unique_counts(np.concatenate([self.keys, keys]), np.concatenate([self.counts, counts]))
+        self.keys, self.counts = merged, totals
+
+
+class FaceCountAccumulator:
+    """
+    A class to keep running per-face totals over chunks of game results in a Monte Carlo simulator
+
+    ...
+
+    Attributes
+    ----------
+    faces : array
+        Sorted array of distinct faces across all dice
+    lookups : list
+        List of per-die arrays mapping face codes to positions in faces
+    totals : array (dtype int or float)
+        Number of times each face was rolled so far (sum of sample weights for weighted chunks)
+
+    Methods
+    -------
+    update(codes, weights=None):
+        Adds a chunk of face codes to the running totals.
+    merge(other):
+        Adds the running totals of another accumulator.
+    """
+    def __init__(self, face_tables):
+        """
+        Constructs all the necessary attributes for the FaceCountAccumulator object.
+
+        INPUTS:
+        face_tables : list of per-die face arrays
+        """
+        self.faces, self.lookups = _global_lookup(face_tables)
+        self.totals = np.zeros(len(self.faces), dtype=np.int64)
+
+    def update(self, codes, weights = None):
+        '''
+        PURPOSE: This method adds a chunk of face codes to the running totals.
+    
+        INPUTS: 
+        codes array of shape chunk rolls by M dice
+        weights None or array (dtype float) of per-play sample weights
+    
+        OUTPUT:
+        None
+        '''
+        for j in range(codes.shape[1]):
+            #Weighted totals are float, so add out of place
+            self.totals = self.totals + np.bincount(self.lookups[j][codes[:, j]], weights, minlength=len(self.faces))
+
+    def merge(self, other):
+        '''
+        PURPOSE: This method adds the running totals of another accumulator.
+    
+        INPUTS: 
+        other FaceCountAccumulator
+    
+        OUTPUT:
+        None
+        '''
+        self.totals = self.totals + other.totals
+
+
+def _row_keys(codes, radices):
+    '''
+    PURPOSE: This function packs each row of face codes into one integer key using a mixed radix over the dice.
+    Keys sort in the same order as the rows they encode.
+
+    INPUTS:
+    codes array of shape N rolls by M dice
+    radices list of the number of faces of each die
+
+    OUTPUT:
+    Array (dtype int64) of N keys, or the rows themselves as int64 when the number of possible keys overflows int64
+    '''
+    if np.prod([float(r) for r in radices]) >= 2.0**63:
+        return codes.astype(np.int64)
+    keys = np.zeros(len(codes), dtype=np.int64)
+    for j, radix in enumerate(radices):
+        keys *= radix
+        keys += codes[:, j]
+    return keys
+
+def _key_rows(keys, radices):
+    '''
+    PURPOSE: This function decodes mixed radix keys back to rows of face codes.
+
+    INPUTS:
+    keys array built by _row_keys
+    radices list of the number of faces of each die
+
+    OUTPUT:
+    Array (dtype int64) of shape K keys by M dice
+    '''
+    if keys.ndim == 2:
+        return keys
+    rows = np.empty((len(keys), len(radices)), dtype=np.int64)
+    rest = keys.copy()
+    for j in range(len(radices) - 1, -1, -1):
+        rest, rows[:, j] = np.divmod(rest, radices[j])
+    return rows
+
+def _multiset_keys(codes, lookups, num_faces):
+    '''
+    PURPOSE: This function packs each roll into one key that ignores which die rolled which face.
+    Rolls are keyed by their per-face count vector (radix M+1 over F faces) or by their sorted faces (radix F over M dice),
+    whichever has fewer possible keys.
+
+    INPUTS:
+    codes array of shape N rolls by M dice
+    lookups list of per-die arrays mapping face codes to positions in the shared set of faces
+    num_faces int (size of the shared set of faces)
+
+    OUTPUT:
+    Tuple of the keys, the radices used and a boolean that is True for count vector keys
+    '''
+    num_dice = codes.shape[1]
+    #Compare the key space sizes in log space, as the sizes themselves overflow floats for many faces
+    if num_faces * np.log(num_dice + 1) < num_dice * np.log(num_faces):
+        radices = [num_dice + 1] * num_faces
+        return _row_keys(_count_faces(codes, lookups, num_faces), radices), radices, True
+    ids = np.empty(codes.shape, dtype=_code_dtype(num_faces))
+    for j in range(num_dice):
+        ids[:, j] = lookups[j][codes[:, j]]
+    ids.sort(axis=1)
+    radices = [num_faces] * num_dice
+    return _row_keys(ids, radices), radices, False
+
+def _multiset_rows(keys, radices, by_counts, num_dice):
+    '''
+    PURPOSE: This function decodes keys built by _multiset_keys to rows of sorted faces.
+
+    INPUTS:
+    keys array
+    radices list of radices used to build the keys
+    by_counts bool (True for count vector keys)
+    num_dice int
+
+    OUTPUT:
+    Array (dtype int64) of shape K keys by M dice holding positions in the shared set of faces, sorted within each row
+    '''
+    rows = _key_rows(keys, radices)
+    if not by_counts:
+        return rows
+    faces = np.tile(np.arange(len(radices)), len(rows))
+    return np.repeat(faces, rows.ravel()).reshape(len(rows), num_dice)
+
+def _unique_counts(keys, counts=None):
+    '''
+    PURPOSE: This function finds the distinct keys and adds up the count of each.
+
+    INPUTS:
+    keys array of 1-D keys or 2-D rows
+    counts array (dtype numeric) of per-key counts, or None to count each key once
+
+    OUTPUT:
+    Tuple of the sorted distinct keys and their counts (dtype int64, or the dtype of counts when given)
+    '''
+    distinct, inverse = np.unique(keys, axis=0 if keys.ndim == 2 else None, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    if counts is None:
+        return distinct, np.bincount(inverse, minlength=len(distinct)).astype(np.int64)
+    totals = np.zeros(len(distinct), dtype=counts.dtype)
+    np.add.at(totals, inverse, counts)
+    return distinct, totals
+
+def _count_faces(codes, lookups, num_faces):
+    '''
+    PURPOSE: This function counts how many times every face is rolled in each roll by scatter-adding one die at a time.
+
+    INPUTS:
+    codes array of shape N rolls by M dice
+    lookups list of per-die arrays mapping face codes to positions in the shared set of faces
+    num_faces int (size of the shared set of faces)
+
+    OUTPUT:
+    Array of shape N rolls by F faces, using the smallest unsigned dtype able to hold M
+    '''
+    counts = np.zeros((len(codes), num_faces), dtype=_code_dtype(codes.shape[1] + 1))
+    rows = np.arange(len(codes))
+    for j in range(codes.shape[1]):
+        #Each die lands on exactly one face per roll, so no index pair repeats within a die
+        counts[rows, lookups[j][codes[:, j]]] += 1
+    return counts
+
+def _accumulate_blocks(dice, face_tables, seed_seq, first, stop, num_plays, blocks_per_chunk):
+    '''
+    PURPOSE: This function plays a contiguous range of blocks chunk by chunk and feeds them to fresh accumulators.
+    It is the unit of work sent to parallel workers, so only accumulators travel back to the caller.
+
+    INPUTS:
+    dice list of Die objects
+    face_tables list of per-die face arrays
+    seed_seq SeedSequence of the play
+    first int (first block)
+    stop int (block after the last block)
+    num_plays int (plays in the whole game, used to size the last block)
+    blocks_per_chunk int
+
+    OUTPUT:
+    Tuple of JackpotAccumulator, ComboAccumulator and FaceCountAccumulator
+    '''
+    accumulators = (JackpotAccumulator(face_tables), ComboAccumulator(face_tables), FaceCountAccumulator(face_tables))
+    dtype = _code_dtype(max(len(t) for t in face_tables))
+    for chunk_first in range(first, stop, blocks_per_chunk):
+        codes, weights = _play_blocks(dice, seed_seq, chunk_first, min(chunk_first + blocks_per_chunk, stop), num_plays, dtype)
+        for accumulator in accumulators:
+            accumulator.update(codes)
+    return accumulators
+
+
+def _accumulate_rows(source, face_tables, start, stop, chunk_size, weights = None):
+    '''
+    PURPOSE: This function feeds stored results chunk by chunk to fresh accumulators.
+    It is the unit of work sent to parallel workers. A results directory is memory-mapped by the worker itself,
+    along with its sample weights if any.
+
+    INPUTS:
+    source face-code matrix or str (results directory)
+    face_tables list of per-die face arrays
+    start int (first row)
+    stop int (row after the last row)
+    chunk_size int
+    weights None or array (dtype float) of per-play sample weights aligned with the face-code matrix
+
+    OUTPUT:
+    Tuple of JackpotAccumulator, ComboAccumulator and FaceCountAccumulator
+    '''
+    if isinstance(source, (str, os.PathLike)):
+        codes = _load_codes(source)
+        weights_file = os.path.join(source, _WEIGHTS_FILE)
+        weights = np.load(weights_file, mmap_mode='r') if os.path.exists(weights_file) else None
+    else:
+        codes = source
+    accumulators = (JackpotAccumulator(face_tables), ComboAccumulator(face_tables), FaceCountAccumulator(face_tables))
+    for chunk_start in range(start, stop, chunk_size):
+        rows = slice(chunk_start, min(chunk_start + chunk_size, stop))
+        chunk = np.asarray(codes[rows])
+        chunk_weights = None if weights is None else np.asarray(weights[rows])
+        for accumulator in accumulators:
+            accumulator.update(chunk, chunk_weights)
+    return accumulators
+
+def _merge_accumulators(face_tables, partials):
+    '''
+    PURPOSE: This function merges the partial accumulators returned by parallel workers, in order.
+
+    INPUTS:
+    face_tables list of per-die face arrays
+    partials list of (JackpotAccumulator, ComboAccumulator, FaceCountAccumulator) tuples
+
+    OUTPUT:
+    Tuple of merged JackpotAccumulator, ComboAccumulator and FaceCountAccumulator
+    '''
+    accumulators = (JackpotAccumulator(face_tables), ComboAccumulator(face_tables), FaceCountAccumulator(face_tables))
+    for partial in partials:
+        for accumulator, other in zip(accumulators, partial):
+            accumulator.merge(other)
+    return accumulators
+
+
+class Analyzer:
+    """
+    A class to analyze the results of a single game and compute various descriptive statistics in a Monte Carlo simulator
 
     ...
 
@@ -188,32 +2062,58 @@ class Analyzer:
     types : str
         String identifying if faces are in string or numeric format
     jackpot_results  : dataframe (Boolean)
-        Stored dataframe of jackpot results
+        Stored dataframe of jackpot results, built on request
     combo_results_sort : dataframe
         Stored dataframe of sorted combo results (wide form)
     combo_results_index : dataframe
         Stored dataframe of sorted combo results (narrow form, multi-columned index)
-    face_counts_per_roll_results : dataframe
+    face_counts_per_roll_results : dataframe, array or sparse matrix
         Stored dataframe of face counts per roll results (wide form)
+    face_counts_faces : array
+        Stored array of faces matching the columns of array or sparse face counts per roll results
+    jackpot_count : int
+        Stored number of jackpots from the most recent streamed or accumulated game
+    face_totals_results : series
+        Stored number of times each face was rolled in the most recent streamed or accumulated game
+    play_until_results : dict
+        Stored estimate, confidence interval, half-width and number of plays of the most recent play_until
+    bootstrap_results : dataframe
+        Stored estimates, confidence bounds and standard errors of the most recent bootstrap
+    last_run_stats : RunStats
+        Measurements of the most recent jackpot, combo or face_counts_per_roll while instrumentation is enabled
+        (see instrument), otherwise None
 
     Methods
     -------
     jackpot():
         Computes how many times the game resulted in all faces being identical.
-    combo():
+    combo(top_k=None, min_count=None, ordered=True):
         Computes the distinct combinations of faces rolled, along with their counts for a Game.
-    face_counts_per_roll():
+    combo_async(top_k=None, min_count=None, ordered=True, chunk_size, progress=None):
+        Computes combo chunk by chunk on the shared async pool without blocking the event loop.
+    face_counts_per_roll(form='frame'):
         Computes how many times a given face is rolled in each event for a Game.
+    stream(num_plays, chunk_size, seed=None, workers=1, executor='thread'):
+        Plays the Game chunk by chunk and computes jackpot, combo and face totals in constant memory.
+    accumulate(chunk_size, workers=1, executor='thread'):
+        Computes jackpot, combo and face totals from the Game's current (possibly memory-mapped) results chunk by chunk.
+    play_until(statistic='jackpot', target=None, half_width=None, rel_error=None, ...):
+        Plays the Game in growing batches until an estimate reaches a requested precision or budget.
+    bootstrap(statistic='jackpot', num_resamples=1000, confidence=0.95, top_k=10, ...):
+        Computes bootstrap confidence intervals for jackpot rate, face frequencies or top combination frequencies.
     """
-    def __init__(self, Game):
+    def __init__(self, Game, cache_size = 32):
         """
         Constructs all the necessary attributes for the Analyzer object.
 
         INPUTS:
         Game : Game object
+        cache_size : int (number of results kept until the Game or its dice change, 0 disables caching)
         """
         self.Game = Game
         self.types = None
+        self.last_run_stats = None
+        self._cache = _LRUCache(cache_size)
         
         #Infer the data type of the die faces used. 
         for c in Game.DieList[0].faces:
@@ -222,6 +2122,153 @@ class Analyzer:
         if self.types != "string":
             self.types = "numeric"
 
+    def _version_key(self):
+        '''
+        PURPOSE: This method identifies the state of the results being analyzed, for caching.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Tuple of the Game version, the dice versions and the id of a user-assigned wide dataframe (None if there is none)
+        '''
+        wide = getattr(self.Game, 'game_df_wide', None)
+        frame = None if wide is None or self.Game._owns(wide) else id(wide)
+        return self.Game.version, tuple(c.version for c in self.Game.DieList), frame
+
+    def _coded(self):
+        '''
+        PURPOSE: This method returns the game results as a face-code matrix.
+        The game's own results are used directly. A wide dataframe assigned to the game by the user is encoded column by column.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Tuple of the face-code matrix, the list of per-column face arrays, the column labels and the roll index
+        (None for the game's own results, see _roll_index)
+        '''
+        wide = getattr(self.Game, 'game_df_wide', None)
+        if wide is None or self.Game._owns(wide):
+            codes, face_tables = self.Game.show_codes()
+            columns = ['Die ' + str(j+1) for j in range(len(face_tables))]
+            return codes, face_tables, columns, None
+
+        face_tables = []
+        codes = np.empty(wide.shape, dtype=np.int64)
+        for j, column in enumerate(wide.columns):
+            faces, codes[:, j] = np.unique(wide[column].to_numpy(), return_inverse=True)
+            face_tables.append(faces)
+        return codes, face_tables, list(wide.columns), wide.index
+
+    def _counted(self):
+        '''
+        PURPOSE: This method returns the game results as a face-count matrix when the game's most recent play was counts-only.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Tuple of the face-count matrix, the sorted array of faces and the roll index (None, see _roll_index), or None
+        when full results (or a user-assigned wide dataframe) are available
+        '''
+        wide = getattr(self.Game, 'game_df_wide', None)
+        counts, faces = self.Game.show_counts()
+        if counts is None or not (wide is None or self.Game._owns(wide)):
+            return None
+        return counts, faces, None
+
+    @staticmethod
+    def _roll_index(index, num_rolls):
+        '''
+        PURPOSE: This method returns the index of dataframe results, building the roll # index of the game's own results
+        only when a dataframe is built, so counting does not need pandas.
+    
+        INPUTS: 
+        index None or index returned by _coded or _counted
+        num_rolls int
+    
+        OUTPUT:
+        Index
+        '''
+        if index is None:
+            return pd.RangeIndex(1, num_rolls+1, name='roll #')
+        return index
+
+    @property
+    def jackpot_results(self):
+        '''
+        PURPOSE: This property builds the series of jackpot results of the most recent jackpot on request.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Boolean series where True indicates Jackpot and False indicates No Jackpot for each roll
+        '''
+        hits, index = self._jackpot_hits
+        return pd.Series(hits, index=self._roll_index(index, len(hits)))
+
+    @property
+    def combo_results_sort(self):
+        '''
+        PURPOSE: This property returns the dataframe of sorted combo results (wide form) of the most recent combo,
+        stream or accumulate, building it on first request.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Dataframe
+        '''
+        return self._combo_frames()[0]
+
+    @property
+    def combo_results_index(self):
+        '''
+        PURPOSE: This property returns the dataframe of sorted combo results indexed by combination (narrow form),
+        building it on first request.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Dataframe
+        '''
+        return self._combo_frames()[1]
+
+    @property
+    def face_totals_results(self):
+        '''
+        PURPOSE: This property builds the series of face totals of the most recent stream, accumulate
+        or exact face_counts_per_roll on request.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Series of the number of times each face was rolled, indexed by face
+        '''
+        totals, faces = self._face_totals
+        return pd.Series(totals, index=faces, name='count')
+
+    def _weights(self):
+        '''
+        PURPOSE: This method returns the per-play sample weights of the game's own importance sampled results.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Array (dtype float), or None when plays are unweighted or the results come from a user-assigned dataframe
+        '''
+        wide = getattr(self.Game, 'game_df_wide', None)
+        if wide is None or self.Game._owns(wide):
+            return self.Game.show_weights()
+        return None
+
+    @_instrumented
+    @_memoized('_jackpot_hits')
     def jackpot(self):
         '''
         PURPOSE: This method computes how many times the game resulted in all faces being identical.
@@ -231,40 +2278,738 @@ class Analyzer:
     
         OUTPUT:
         Returns an integer for the number of times to the user
+        (a float estimate, i.e. the sum of sample weights of jackpot plays, for an importance sampled game)
         '''
-        #Check all columns against the first column using eq. 
-        #Create a boolean dataframe where True indicates Jackpot and False indicates No Jackpot for each roll.
-        self.jackpot_results = self.Game.game_df_wide.eq(self.Game.game_df_wide.iloc[:,0],axis=0).all(1)
-        true_count = len(self.jackpot_results[self.jackpot_results == True])
-        return true_count
-    
-    def combo(self):
+        #Compare every die's face against the first die's face on shared face positions.
+        #Build a boolean series where True indicates Jackpot and False indicates No Jackpot for each roll.
+        counted = self._counted()
+        if counted is not None:
+            #A counts-only roll is a jackpot when one face was rolled by every die
+            counts, faces, index = counted
+            with _stage('count', len(counts)) as stage:
+                hits = (counts == len(self.Game.DieList)).any(axis=1)
+                self._jackpot_hits = (hits, index)
+                stage.measure(hits)
+            return int(hits.sum())
+        with _stage('encode') as stage:
+            codes, face_tables, columns, index = self._coded()
+            stage.measure(codes)
+        with _stage('count', len(codes)) as stage:
+            hits = JackpotAccumulator(face_tables).hits(codes)
+            self._jackpot_hits = (hits, index)
+            stage.measure(hits)
+        weights = self._weights()
+        if weights is not None:
+            return float(weights[hits].sum())
+        return int(hits.sum())
+
+    @_instrumented
+    @_memoized('_combos')
+    def combo(self, top_k = None, min_count = None, ordered = True):
         '''
         PURPOSE: This method computes the distinct combinations of faces rolled, along with their counts for a Game.
+        Each roll is packed into one integer key, so combinations are counted without hashing rows of faces.
+        With ordered=False rolls that differ only in which die rolled which face are counted together,
+        and the faces of each combination are listed in sorted order.
     
         INPUTS: 
-        None
+        top_k None or int (keep only the most frequent combinations)
+        min_count None or numeric (drop combinations seen fewer times; importance sampled counts are summed sample weights,
+                                    which are often below 1, so nothing is dropped by default)
+        ordered bool (False to count unordered combinations)
     
         OUTPUT:
         Stores the results as a dataframe in a public attribute. 
+        Counts are sums of sample weights (unbiased estimates) for an importance sampled game.
+        Returns error message for ordered combinations of a counts-only play.
         '''
-        #Group and get value counts
-        combo_results = self.Game.game_df_wide.groupby(list(self.Game.game_df_wide.columns.values), as_index=False).value_counts()
-        col_list = list(combo_results.columns.values)
-        #sort and set multi-index
-        self.combo_results_sort = combo_results.sort_values(by=['count'], ascending=False)
-        self.combo_results_index = self.combo_results_sort.set_index(col_list[:-1])
+        counted = self._counted()
+        if counted is not None and ordered:
+            return "Only face counts were played. Try ordered=False."
+        coded = None
+        if counted is None:
+            with _stage('encode') as stage:
+                coded = self._coded()
+                stage.measure(coded[0])
+        keys_of, radices, face_tables, by_counts = self._combo_keys(counted, coded, ordered)
+        num_rolls = len((counted or coded)[0])
+        with _stage('count', num_rolls) as stage:
+            keys, counts = _unique_counts(keys_of(slice(None)), self._weights())
+            stage.measure(keys)
 
-    def face_counts_per_roll(self):
+        columns = coded[2] if coded is not None else ['Die ' + str(j+1) for j in range(len(face_tables))]
+        self._finish_combos(keys, counts, radices, face_tables, columns, top_k, min_count, by_counts)
+
+    def _combo_keys(self, counted, coded, ordered):
+        '''
+        PURPOSE: This method picks how combinations are packed into keys, for combo, combo_async and bootstrap.
+        Face-count rows of a counts-only play are already count vector keys over the shared set of faces.
+        Face-code rows are keyed by their codes (ordered) or by _multiset_keys (unordered).
+    
+        INPUTS: 
+        counted None or tuple returned by _counted
+        coded None or tuple returned by _coded (used when counted is None)
+        ordered bool
+    
+        OUTPUT:
+        Tuple of a function returning the keys of a slice of rolls, the radices of the keys, the per-column face tables
+        and by_counts (None for ordered keys, otherwise the flag returned by _multiset_keys)
+        '''
+        if counted is not None:
+            counts, faces, index = counted
+            num_dice = len(self.Game.DieList)
+            radices = [num_dice + 1] * len(faces)
+            return (lambda rows: _row_keys(counts[rows], radices)), radices, [faces] * num_dice, True
+
+        codes, face_tables, columns, index = coded
+        if ordered:
+            radices = [len(t) for t in face_tables]
+            return (lambda rows: _row_keys(codes[rows], radices)), radices, face_tables, None
+        faces, lookups = _global_lookup(face_tables)
+        radices, by_counts = _multiset_keys(codes[:1], lookups, len(faces))[1:]
+        return (lambda rows: _multiset_keys(codes[rows], lookups, len(faces))[0]), radices, [faces] * len(face_tables), by_counts
+
+    async def combo_async(self, top_k = None, min_count = None, ordered = True, chunk_size = 1 << 18, progress = None):
+        '''
+        PURPOSE: This method computes the same combinations as combo without blocking the event loop.
+        Rolls are counted chunk by chunk on the shared async_pool and the event loop is free between chunks.
+    
+        INPUTS: 
+        top_k None or int (keep only the most frequent combinations)
+        min_count None or numeric (drop combinations seen fewer times; importance sampled counts are summed sample weights,
+                                    which are often below 1, so nothing is dropped by default)
+        ordered bool (False to count unordered combinations)
+        chunk_size int (rolls per chunk)
+        progress None or callable taking the number of rolls counted and the total (called after every chunk)
+    
+        OUTPUT:
+        Stores the results as a dataframe in a public attribute. 
+        Returns error message for ordered combinations of a counts-only play.
+        '''
+        import asyncio
+        loop = asyncio.get_running_loop()
+        counted = self._counted()
+        if counted is not None and ordered:
+            return "Only face counts were played. Try ordered=False."
+        coded = None if counted is not None else await _run_async(loop, self._coded)
+        keys_of, radices, tables, by_counts = self._combo_keys(counted, coded, ordered)
+        num_rolls, weights = len((counted or coded)[0]), self._weights()
+        columns = coded[2] if coded is not None else ['Die ' + str(j+1) for j in range(len(tables))]
+
+        def count(rows, keys, totals):
+            chunk_keys, chunk_totals = _unique_counts(keys_of(rows), None if weights is None else weights[rows])
+            if keys is None:
+                return chunk_keys, chunk_totals
+            return _unique_counts(np.concatenate((keys, chunk_keys)), np.concatenate((totals, chunk_totals)))
+
+        keys = totals = None
+        for start in range(0, num_rolls, chunk_size):
+            rows = slice(start, min(start + chunk_size, num_rolls))
+            keys, totals = await _run_async(loop, count, rows, keys, totals)
+            if progress is not None:
+                progress(rows.stop, num_rolls)
+        if keys is None:
+            keys, totals = _unique_counts(keys_of(slice(0, 0)))
+        await _run_async(loop, self._finish_combos, keys, totals, radices, tables, columns, top_k, min_count, by_counts)
+
+    @_instrumented
+    @_memoized('face_counts_per_roll_results', 'face_counts_faces')
+    def face_counts_per_roll(self, form = 'frame'):
         '''
         PURPOSE: This method computes how many times a given face is rolled in each event for a Game. 
     
+        INPUTS: 
+        form str ('frame', 'array' or 'sparse')
+    
+        OUTPUT:
+        Stores the results in a public attribute: a dataframe of the faces rolled at least once (default),
+        a compact integer array over all faces, or a scipy sparse matrix over all faces.
+        Stores the faces matching the array or sparse matrix columns in a public attribute.
+        Returns error message for invalid form, or for form='sparse' without scipy installed.
+        '''
+        if form not in ('frame', 'array', 'sparse'):
+            return "Not a valid form. Try again."
+        if form == 'sparse':
+            try:
+                from scipy import sparse
+            except ImportError:
+                return "Sparse results need scipy. Try pip install .[sparse] or form='array'."
+        counted = self._counted()
+        if counted is not None:
+            #A counts-only play already holds the face counts per roll
+            counts, faces, index = counted
+            self.face_counts_faces = faces
+            if form == 'sparse':
+                self.face_counts_per_roll_results = sparse.csr_matrix(counts.astype(np.int64))
+                return
+        else:
+            with _stage('encode') as stage:
+                codes, face_tables, columns, index = self._coded()
+                stage.measure(codes)
+            faces, lookups = _global_lookup(face_tables)
+            self.face_counts_faces = faces
+
+            if form == 'sparse':
+                with _stage('count', len(codes)):
+                    ids = np.stack([lookups[j][codes[:, j]] for j in range(codes.shape[1])], axis=1)
+                    rows = np.repeat(np.arange(len(codes)), codes.shape[1])
+                    self.face_counts_per_roll_results = sparse.csr_matrix((np.ones(ids.size, dtype=np.int64), (rows, ids.ravel())),
+                                                                          shape=(len(codes), len(faces)))
+                return
+            with _stage('count', len(codes)) as stage:
+                counts = _count_faces(codes, lookups, len(faces))
+                stage.measure(counts)
+
+        if form == 'array':
+            self.face_counts_per_roll_results = counts
+            return
+
+        #Keep only faces rolled at least once, in sorted order, as float counts
+        with _stage('frame', len(counts)) as stage:
+            observed = counts.any(axis=0)
+            self.face_counts_per_roll_results = pd.DataFrame(counts[:, observed].astype(float), index=self._roll_index(index, len(counts)),
+                                                             columns=faces[observed])
+            stage.measure(self.face_counts_per_roll_results)
+
+    def stream(self, num_plays, chunk_size = _BLOCK_SIZE, seed = None, workers = 1, executor = 'thread'):
+        '''
+        PURPOSE: This method plays the Game chunk by chunk and feeds every chunk to online accumulators,
+        so the number of plays is not limited by memory. Results match play followed by jackpot and combo for the same seed.
+        With several workers each one accumulates its own range of blocks and only the accumulators are merged.
+    
+        INPUTS: 
+        num_plays int
+        chunk_size int (number of plays per chunk)
+        seed None, int, SeedSequence or Generator
+        workers int (number of parallel workers)
+        executor str ('thread' or 'process')
+    
+        OUTPUT:
+        Returns an integer for the number of jackpots to the user.
+        Stores the jackpot count, combo results and face totals in public attributes.
+        Returns error message for invalid executor.
+        '''
+        face_tables = _face_tables(self.Game.DieList)
+        if workers == 1:
+            accumulators = (JackpotAccumulator(face_tables), ComboAccumulator(face_tables), FaceCountAccumulator(face_tables))
+            for codes in self.Game.play_stream(num_plays, chunk_size, seed):
+                for accumulator in accumulators:
+                    accumulator.update(codes)
+            return self._store_accumulators(*accumulators)
+
+        pool = _make_pool(executor, workers)
+        if pool is None:
+            return "Not a valid executor. Try again."
+        for c in self.Game.DieList:
+            c._cdf()
+        seed_seq = self.Game._start(seed)
+        blocks_per_chunk = max(1, -(-chunk_size // _BLOCK_SIZE))
+        with pool:
+            futures = [pool.submit(_accumulate_blocks, self.Game.DieList, face_tables, seed_seq, first, stop, num_plays, blocks_per_chunk)
+                       for first, stop in _split_blocks(num_plays, workers)]
+            partials = [future.result() for future in futures]
+        return self._store_accumulators(*_merge_accumulators(face_tables, partials))
+
+    @_memoized('jackpot_count', '_face_totals', '_combos')
+    def accumulate(self, chunk_size = 1 << 20, workers = 1, executor = 'thread'):
+        '''
+        PURPOSE: This method reads the Game's current results chunk by chunk and feeds every chunk to online accumulators.
+        It works on results loaded with Game.load that do not fit in memory. With the process executor and saved results,
+        every worker maps the results file itself, so rows are never copied between processes.
+        Importance sampled results are weighted by their sample weights, as in jackpot and combo.
+    
+        INPUTS: 
+        chunk_size int (number of rolls per chunk)
+        workers int (number of parallel workers)
+        executor str ('thread' or 'process')
+    
+        OUTPUT:
+        Returns an integer for the number of jackpots to the user.
+        Stores the jackpot count, combo results and face totals in public attributes.
+        Returns error message for invalid executor.
+        '''
+        codes, face_tables = self.Game.show_codes()
+        weights = self.Game.show_weights()
+        if workers == 1:
+            return self._store_accumulators(*_accumulate_rows(codes, face_tables, 0, len(codes), chunk_size, weights))
+
+        pool = _make_pool(executor, workers)
+        if pool is None:
+            return "Not a valid executor. Try again."
+        edges = np.linspace(0, len(codes), workers + 1).round().astype(int)
+        with pool:
+            futures = []
+            for start, stop in zip(edges[:-1], edges[1:]):
+                if executor == 'process' and self.Game.path is not None:
+                    futures.append(pool.submit(_accumulate_rows, self.Game.path, face_tables, int(start), int(stop), chunk_size))
+                else:
+                    futures.append(pool.submit(_accumulate_rows, codes[start:stop], face_tables, 0, int(stop - start), chunk_size,
+                                               None if weights is None else weights[start:stop]))
+            partials = [future.result() for future in futures]
+        return self._store_accumulators(*_merge_accumulators(face_tables, partials))
+
+    def play_until(self, statistic = 'jackpot', target = None, half_width = None, rel_error = None, confidence = 0.95,
+                   batch_size = _BLOCK_SIZE, max_batch_size = 1 << 20, max_plays = 10**9, max_seconds = None, seed = None):
+        '''
+        PURPOSE: This method plays the Game in batches that double in size until an estimate is precise enough.
+        Batches stop growing at max_batch_size and only running sums are kept, so memory use does not grow with max_plays.
+        Plays are drawn in blocks as in play, but batches take them row by row, so a loose target can stop within the first block.
+        The estimate is the mean per play of the chosen statistic, with a normal confidence interval.
+        Playing stops once the interval half-width reaches half_width or rel_error times the estimate
+        (only after the statistic has varied between plays), or when max_plays or max_seconds is reached.
+    
+        INPUTS: 
+        statistic str ('jackpot' for the jackpot rate, 'face' for times target face is rolled per play,
+                       'combo' for the rate of the target combination of faces)
+        target None, face value or tuple of face values (one per die)
+        half_width None or float (target confidence interval half-width)
+        rel_error None or float (target half-width relative to the estimate)
+        confidence float
+        batch_size int (plays in the first batch, which may be smaller than a block of plays)
+        max_batch_size int (largest batch, in plays)
+        max_plays int
+        max_seconds None or float
+        seed None, int, SeedSequence or Generator
+    
+        OUTPUT:
+        Returns a dictionary with the estimate, the confidence interval, its half-width and the number of plays used.
+        Stores the dictionary in a public attribute.
+        Returns error message for invalid statistic or target.
+        '''
+        dice = self.Game.DieList
+        face_tables = _face_tables(dice)
+        faces, lookups = _global_lookup(face_tables)
+        if statistic == 'jackpot':
+            values = JackpotAccumulator(face_tables).hits
+        elif statistic == 'face':
+            if target not in faces:
+                return "Please choose a valid face value."
+            face = np.searchsorted(faces, target)
+            def values(codes):
+                return _count_faces(codes, lookups, len(faces))[:, face]
+        elif statistic == 'combo':
+            if target is None or len(target) != len(dice) or any(f not in t for f, t in zip(target, face_tables)):
+                return "Please choose a valid combination of face values."
+            combo_codes = np.array([np.flatnonzero(t == f)[0] for f, t in zip(target, face_tables)])
+            def values(codes):
+                return (codes == combo_codes).all(axis=1)
+        else:
+            return "Not a valid statistic. Try again."
+
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        seed_seq = self.Game._start(seed)
+        dtype = _code_dtype(max(len(t) for t in face_tables))
+        last_block = -(-max_plays // _BLOCK_SIZE)
+        started = time.perf_counter()
+        plays, total, total_sq = 0, 0.0, 0.0
+        #Rows of played blocks not used by a batch yet
+        pending = np.empty((0, len(dice)), dtype=dtype)
+        block, batch = 0, max(1, batch_size)
+        while True:
+            wanted = min(batch, max_plays - plays)
+            if len(pending) < wanted:
+                stop = min(block + -(-(wanted - len(pending)) // _BLOCK_SIZE), last_block)
+                pending = np.concatenate((pending, _play_blocks(dice, seed_seq, block, stop, max_plays, dtype)[0]))
+                block = stop
+            x = values(pending[:wanted]).astype(float)
+            pending = pending[wanted:]
+            plays += len(x)
+            total += x.sum()
+            total_sq += (x * x).sum()
+            batch = min(batch * 2, max(1, max_batch_size))
+
+            estimate = total / plays
+            variance = max(total_sq / plays - estimate**2, 0) * plays / max(plays - 1, 1)
+            error = z * np.sqrt(variance / plays)
+            precise = variance > 0 and ((half_width is not None and error <= half_width) or
+                                        (rel_error is not None and error <= rel_error * abs(estimate)))
+            out_of_time = max_seconds is not None and time.perf_counter() - started >= max_seconds
+            if precise or out_of_time or plays >= max_plays:
+                break
+
+        self.play_until_results = {'estimate': float(estimate), 'ci': (float(estimate - error), float(estimate + error)),
+                                   'half_width': float(error), 'num_plays': plays}
+        return self.play_until_results
+
+    @_memoized('bootstrap_results')
+    def bootstrap(self, statistic = 'jackpot', num_resamples = 1000, confidence = 0.95, top_k = 10, ordered = True,
+                  method = 'poisson', chunk_size = None, seed = None):
+        '''
+        PURPOSE: This method computes bootstrap confidence intervals for the jackpot rate, per-face frequencies
+        or the frequencies of the top_k combinations, without playing the Game again.
+        Rolls are resampled through weights instead of copies: every chunk of per-roll values (jackpot indicators,
+        face counts or top combination indicators) is multiplied by a matrix of resample weights, one row per replicate.
+        'poisson' draws independent Poisson(1) weights from a lookup table; 'multinomial' draws the classic bootstrap's resample counts,
+        split across chunks with binomial draws. Intervals are percentile intervals of the replicates.
+    
+        INPUTS: 
+        statistic str ('jackpot', 'face' or 'combo')
+        num_resamples int (number of bootstrap replicates)
+        confidence float (confidence level of the intervals)
+        top_k int (number of most frequent combinations, for statistic='combo')
+        ordered bool (False to count unordered combinations, for statistic='combo')
+        method str ('poisson' or 'multinomial')
+        chunk_size None or int (rolls per chunk, defaults to keeping the weight matrix near 32MB)
+        seed None, int or Generator
+    
+        OUTPUT:
+        Stores and returns a dataframe of the estimate, lower and upper confidence bounds and standard error,
+        indexed by 'jackpot', by face or by combination. Frequencies are per roll for jackpots and combinations
+        and per die roll for faces. An importance sampled game's sample weights are applied to every roll.
+        Returns error message for invalid statistic or method.
+        '''
+        if statistic not in ('jackpot', 'face', 'combo'):
+            return "Not a valid statistic. Try again."
+        if method not in ('poisson', 'multinomial'):
+            return "Not a valid method. Try again."
+        counted = self._counted()
+        num_dice = len(self.Game.DieList)
+        if counted is not None:
+            if statistic == 'combo' and ordered:
+                return "Only face counts were played. Try ordered=False."
+            counts, faces, index = counted
+            num_rolls = len(counts)
+        else:
+            coded = self._coded()
+            codes, face_tables, columns, index = coded
+            num_dice = len(face_tables)
+            faces, lookups = _global_lookup(face_tables)
+            num_rolls = len(codes)
+        columns = ['Die ' + str(j+1) for j in range(num_dice)] if counted is not None else columns
+        weights = self._weights()
+        scale = 1.0
+
+        #Build the per-roll values of a chunk of rows and the labels of their columns
+        if statistic == 'jackpot':
+            labels = ['jackpot']
+            if counted is not None:
+                values = lambda rows: (counts[rows] == num_dice).any(axis=1)[:, None]
+            else:
+                jackpot = JackpotAccumulator(face_tables)
+                values = lambda rows: jackpot.hits(codes[rows])[:, None]
+        elif statistic == 'face':
+            labels = pd.Index(faces, name='face')
+            scale = 1.0 / num_dice
+            if counted is not None:
+                values = lambda rows: counts[rows]
+            else:
+                values = lambda rows: _count_faces(codes[rows], lookups, len(faces))
+        else:
+            keys_of, radices, tables, by_counts = self._combo_keys(counted, None if counted is not None else coded, ordered)
+            keys = keys_of(slice(None))
+            distinct, inverse = np.unique(keys, axis=0 if keys.ndim == 2 else None, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            totals = np.bincount(inverse, weights=weights, minlength=len(distinct))
+            top = np.argsort(-totals, kind='stable')[:top_k]
+            position = np.full(len(distinct), -1)
+            position[top] = np.arange(len(top))
+            if by_counts is None:
+                rows = _key_rows(distinct[top], radices)
+            else:
+                rows = _multiset_rows(distinct[top], radices, by_counts, num_dice)
+            labels = pd.MultiIndex.from_arrays([tables[j][rows[:, j]] for j in range(num_dice)], names=columns)
+
+            def values(rows):
+                slots = position[inverse[rows]]
+                hit = slots >= 0
+                out = np.zeros((len(slots), len(top)))
+                out[np.nonzero(hit)[0], slots[hit]] = 1
+                return out
+
+        rng = _as_generator(seed)
+        if chunk_size is None:
+            chunk_size = max(1, (1 << 22) // num_resamples)
+        sums = np.zeros((num_resamples, len(labels)))
+        resampled = np.zeros(num_resamples)
+        point = np.zeros(len(labels))
+        draws_left = np.full(num_resamples, num_rolls)
+        for start in range(0, num_rolls, chunk_size):
+            rows = slice(start, min(start + chunk_size, num_rolls))
+            n = rows.stop - start
+            x = values(rows).astype(float)
+            if weights is not None:
+                x *= weights[rows, None]
+            if method == 'poisson':
+                w = _poisson_table()[rng.integers(0, 2**16, size=(num_resamples, n), dtype=np.uint16)].astype(float)
+            else:
+                #Resample counts falling in this chunk, then spread over its rows: every replicate's draws are picked
+                #uniformly at once and counted with one bincount, which is an equal-probability multinomial
+                take = rng.binomial(draws_left, n / (num_rolls - start))
+                draws_left -= take
+                picks = np.repeat(np.arange(num_resamples) * n, take) + rng.integers(0, n, size=int(take.sum()))
+                w = np.bincount(picks, minlength=num_resamples * n).reshape(num_resamples, n).astype(float)
+            sums += w @ x
+            resampled += w.sum(axis=1)
+            point += x.sum(axis=0)
+
+        replicates = sums / np.maximum(resampled, 1)[:, None] * scale
+        alpha = (1 - confidence) / 2
+        self.bootstrap_results = pd.DataFrame({'estimate': point / max(num_rolls, 1) * scale,
+                                               'lower': np.quantile(replicates, alpha, axis=0),
+                                               'upper': np.quantile(replicates, 1 - alpha, axis=0),
+                                               'std_error': replicates.std(axis=0, ddof=1)}, index=labels)
+        return self.bootstrap_results
+
+    def _store_accumulators(self, jackpot, combos, face_counts):
+        '''
+        PURPOSE: This method stores the results held by finished accumulators in public attributes.
+    
+        INPUTS: 
+        jackpot JackpotAccumulator
+        combos ComboAccumulator
+        face_counts FaceCountAccumulator
+    
+        OUTPUT:
+        Returns an integer for the number of jackpots
+        '''
+        #Only arrays are kept, so counting does not need pandas. Dataframes are built when first requested.
+        self.jackpot_count = jackpot.count
+        self._face_totals = (face_counts.totals, face_counts.faces)
+        columns = ['Die ' + str(j+1) for j in range(len(combos.face_tables))]
+        self._combos = {'rows': combos.rows(), 'counts': combos.counts, 'face_tables': combos.face_tables,
+                        'columns': columns, 'frames': None}
+        return self.jackpot_count
+
+    def _finish_combos(self, keys, counts, radices, face_tables, columns, top_k, min_count, by_counts):
+        '''
+        PURPOSE: This method filters counted combination keys, decodes the ones kept and stores them as sorted combo results.
+    
+        INPUTS: 
+        keys array of sorted distinct keys
+        counts array of per-key counts
+        radices list of radices used to build the keys
+        face_tables list of per-column face arrays
+        columns list of column labels
+        top_k None or int (keep only the most frequent combinations)
+        min_count None or numeric (drop combinations counted fewer times)
+        by_counts None for ordered keys, otherwise the flag returned by _multiset_keys
+    
+        OUTPUT:
+        None
+        '''
+        #Filter and keep the top combinations before decoding any faces
+        if min_count:
+            keep = counts >= min_count
+            keys, counts = keys[keep], counts[keep]
+        if top_k is not None:
+            top = np.sort(np.argsort(-counts, kind='stable')[:top_k])
+            keys, counts = keys[top], counts[top]
+        if by_counts is None:
+            self._store_combos(_key_rows(keys, radices), counts, face_tables, columns)
+            return
+
+        #Count vector keys do not sort like the faces they hold, so put combinations back in face order
+        rows = _multiset_rows(keys, radices, by_counts, len(columns))
+        order = np.lexsort(rows.T[::-1])
+        self._store_combos(rows[order], counts[order], face_tables, columns)
+
+    def _store_combos(self, rows, counts, face_tables, columns):
+        '''
+        PURPOSE: This method decodes distinct face-code rows and stores them as sorted combo results.
+        Combinations with equal counts keep the order of rows.
+    
+        INPUTS: 
+        rows array of shape K combinations by M dice
+        counts array (dtype numeric) of length K
+        face_tables list of per-die face arrays
+        columns list of column labels
+    
+        OUTPUT:
+        None
+        '''
+        self._combos = {'rows': rows, 'counts': counts, 'face_tables': face_tables, 'columns': columns, 'frames': None}
+        with _stage('decode', len(rows)) as stage:
+            stage.measure(self._combo_frames()[0])
+
+    def _combo_frames(self):
+        '''
+        PURPOSE: This method decodes the stored combination rows into the wide and indexed combo results dataframes,
+        once per set of stored combinations.
+    
         INPUTS: 
         None
     
+        OUTPUT:
+        Tuple of the wide and indexed dataframes
+        '''
+        combos = self._combos
+        if combos['frames'] is None:
+            rows, counts, columns = combos['rows'], combos['counts'], combos['columns']
+            order = np.argsort(-counts, kind='stable')
+            combo_results = pd.DataFrame({column: pd.Categorical.from_codes(rows[order, j], categories=combos['face_tables'][j])
+                                          for j, column in enumerate(columns)})
+            combo_results['count'] = counts[order]
+            combos['frames'] = (combo_results, combo_results.set_index(columns))
+        return combos['frames']
+
+
+class ExactAnalyzer(Analyzer):
+    """
+    A class to compute the exact distribution of a Game's results from its dice's faces and weights, without sampling,
+    in a Monte Carlo simulator. Results are expected counts in the same form as Analyzer results, so it can replace
+    an Analyzer or be used to check one.
+
+    ...
+
+    Attributes
+    ----------
+    num_plays : int
+        Number of plays the expected counts are computed for
+    max_combos : int
+        Largest number of combinations that will be enumerated
+    jackpot_probability : float
+        Stored probability that a single play is a jackpot
+    face_count_distribution_results : dataframe
+        Stored probability of each face being rolled a given number of times in a single play (rows are counts)
+    face_totals_results : series
+        Stored expected number of times each face is rolled over num_plays
+
+    Methods
+    -------
+    jackpot():
+        Computes the expected number of jackpots over num_plays.
+    combo(top_k=None, min_count=0, ordered=True):
+        Computes the expected count of every possible combination of faces over num_plays.
+    face_counts_per_roll():
+        Computes the exact distribution of how many times each face is rolled in a single play.
+    """
+    def __init__(self, Game, num_plays = 1, max_combos = 10**6):
+        """
+        Constructs all the necessary attributes for the ExactAnalyzer object.
+
+        INPUTS:
+        Game : Game object
+        num_plays : int (number of plays the expected counts are computed for)
+        max_combos : int (largest number of combinations that will be enumerated)
+        """
+        super().__init__(Game)
+        self.num_plays = num_plays
+        self.max_combos = max_combos
+
+    def _version_key(self):
+        '''
+        PURPOSE: This method identifies the dice and settings the exact results are computed from, for caching.
+        The Game's results are part of the key too, as the inherited methods (accumulate, bootstrap) read them.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Tuple of the Analyzer key (see Analyzer._version_key), num_plays and max_combos
+        '''
+        return super()._version_key(), self.num_plays, self.max_combos
+
+    def _probabilities(self):
+        '''
+        PURPOSE: This method returns every die's normalized weights placed on a shared set of faces.
+        A face listed more than once on a die gets the sum of its weights.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Tuple of the sorted array of distinct faces, the list of per-die face tables (see Die._face_table)
+        and an M dice by F faces array of probabilities
+        '''
+        face_tables = _face_tables(self.Game.DieList)
+        faces, lookups = _global_lookup(face_tables)
+        probabilities = np.zeros((len(face_tables), len(faces)))
+        for j, c in enumerate(self.Game.DieList):
+            remap = c._face_table()[1]
+            positions = lookups[j] if remap is None else lookups[j][remap]
+            np.add.at(probabilities[j], positions, c.weights / np.sum(c.weights, dtype=float))
+        return faces, face_tables, probabilities
+
+    @_memoized('jackpot_probability')
+    def jackpot(self):
+        '''
+        PURPOSE: This method computes the expected number of jackpots over num_plays.
+        A jackpot probability is the sum over faces of the product of every die's probability of rolling that face.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Returns a float for the expected number of jackpots to the user.
+        Stores the probability of a jackpot in a public attribute.
+        '''
+        faces, face_tables, probabilities = self._probabilities()
+        self.jackpot_probability = float(probabilities.prod(axis=0).sum())
+        return self.jackpot_probability * self.num_plays
+
+    @_memoized('_combos')
+    def combo(self, top_k = None, min_count = 0, ordered = True):
+        '''
+        PURPOSE: This method computes the expected count of every possible combination of faces over num_plays.
+        Ordered combinations are enumerated as an outer product of the dice's probabilities.
+        Unordered combinations are built by convolving one die at a time over per-face count vectors.
+    
+        INPUTS: 
+        top_k None or int (keep only the most likely combinations)
+        min_count numeric (drop combinations with a smaller expected count)
+        ordered bool (False to compute unordered combinations)
+    
         OUTPUT:
         Stores the results as a dataframe in a public attribute.
+        Returns error message when there are more than max_combos combinations.
+        '''
+        faces, face_tables, probabilities = self._probabilities()
+        columns = ['Die ' + str(j+1) for j in range(len(face_tables))]
+        num_dice, num_faces = probabilities.shape
+
+        #Compare in log space, as (M+1)**F overflows floats for many faces
+        if not ordered and num_faces * np.log(num_dice + 1) < 63 * np.log(2):
+            #Each state is a per-face count vector packed with radix M+1, as in _multiset_keys
+            radices = [num_dice + 1] * num_faces
+            steps = (num_dice + 1) ** np.arange(num_faces - 1, -1, -1, dtype=np.int64)
+            keys, expected = np.zeros(1, dtype=np.int64), np.ones(1)
+            for j in range(num_dice):
+                rolled = probabilities[j] > 0
+                keys, expected = _unique_counts((keys[:, None] + steps[rolled]).ravel(),
+                                                (expected[:, None] * probabilities[j, rolled]).ravel())
+                if len(keys) > self.max_combos:
+                    return "Too many combinations to compute exactly. Try sampling instead."
+            self._finish_combos(keys, expected * self.num_plays, radices, [faces] * num_dice, columns, top_k, min_count, True)
+            return
+
+        radices = [len(t) for t in face_tables]
+        if np.prod([float(r) for r in radices]) > self.max_combos:
+            return "Too many combinations to compute exactly. Try sampling instead."
+
+        #Outer product over dice, so position k holds the probability of the combination with mixed radix key k
+        universe, lookups = _global_lookup(face_tables)
+        expected = np.ones(1)
+        for j in range(num_dice):
+            expected = np.multiply.outer(expected, probabilities[j, lookups[j]]).ravel()
+        keys = np.flatnonzero(expected)
+        expected = expected[keys] * self.num_plays
+        if ordered:
+            self._finish_combos(keys, expected, radices, face_tables, columns, top_k, min_count, None)
+            return
+
+        multiset_keys, radices, by_counts = _multiset_keys(_key_rows(keys, radices), lookups, len(universe))
+        keys, expected = _unique_counts(multiset_keys, expected)
+        self._finish_combos(keys, expected, radices, [universe] * num_dice, columns, top_k, min_count, by_counts)
+
+    @_memoized('face_count_distribution_results', '_face_totals')
+    def face_counts_per_roll(self):
+        '''
+        PURPOSE: This method computes the exact distribution of how many times each face is rolled in a single play,
+        by convolving one die at a time, and the expected total of each face over num_plays.
+    
+        INPUTS: 
+        None
+    
+        OUTPUT:
+        Stores the distribution as a dataframe (rows are counts 0 to M, columns are faces) in a public attribute.
+        Stores the expected face totals as a series in a public attribute.
         '''
-        #Apply value_counts() to each row of the wide view game
-        face_counts_per_roll_results_1 = self.Game.game_df_wide.apply(pd.value_counts, axis=1)
-        self.face_counts_per_roll_results = face_counts_per_roll_results_1.replace(np.nan,0)
+        faces, face_tables, probabilities = self._probabilities()
+        distribution = np.zeros((len(face_tables) + 1, len(faces)))
+        distribution[0] = 1
+        for j in range(len(face_tables)):
+            rolled = distribution * probabilities[j]
+            distribution *= 1 - probabilities[j]
+            distribution[1:] += rolled[:-1]
+        self.face_count_distribution_results = pd.DataFrame(distribution, index=pd.RangeIndex(len(distribution), name='count'), columns=faces)
+        self._face_totals = (probabilities.sum(axis=0) * self.num_plays, faces)
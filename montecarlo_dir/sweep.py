@@ -0,0 +1,196 @@
+import hashlib
+import os
+import shutil
+import uuid
+import numpy as np
+from montecarlo_dir.montecarlo import Die, LargeDie, Game, _BLOCK_SIZE, _make_pool, _make_die
+
+
+def _dice_spec(config):
+    '''
+    PURPOSE: This function turns a game configuration into plain (faces, weights) arrays, one pair per die,
+    along with whether the die is a LargeDie.
+
+    INPUTS:
+    config list of Die objects or of (faces, weights) pairs
+
+    OUTPUT:
+    List of (faces array, weights array, bool) tuples
+    '''
+    spec = []
+    for die in config:
+        if isinstance(die, Die):
+            spec.append((die.faces.copy(), die.weights.copy(), isinstance(die, LargeDie)))
+        else:
+            faces, weights = die
+            spec.append((np.asarray(faces), np.asarray(weights), False))
+    return spec
+
+def _run_config(spec, num_plays, seed, path):
+    '''
+    PURPOSE: This function plays one configuration into a results directory. It is the unit of work sent to workers.
+    Results are written to a temporary directory first and renamed into place, so a cache entry is never partial.
+
+    INPUTS:
+    spec list of (faces, weights, large) tuples
+    num_plays int
+    seed int
+    path str (final results directory)
+
+    OUTPUT:
+    None
+    '''
+    dice = [_make_die(faces, weights, large) for faces, weights, large in spec]
+    temporary = path + '.' + uuid.uuid4().hex + '.tmp'
+    Game(dice).play(num_plays, seed=seed, path=temporary)
+    try:
+        os.rename(temporary, path)
+    except OSError:
+        #Another worker or process finished the same configuration first
+        shutil.rmtree(temporary, ignore_errors=True)
+
+def _directory_size(path):
+    '''
+    PURPOSE: This function adds up the size of the files in a directory.
+
+    INPUTS:
+    path str
+
+    OUTPUT:
+    Integer number of bytes
+    '''
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class Sweep:
+    """
+    A class to run batches of Games over many die configurations in a Monte Carlo simulator,
+    keeping results in an on-disk cache addressed by the content of each configuration
+
+    ...
+
+    Attributes
+    ----------
+    cache_dir : str
+        Directory holding one results directory per cached configuration
+    max_cache_bytes : int
+        Size the cache is trimmed back to after every run, evicting least recently used entries first
+    hits : int
+        Number of configurations of the most recent run found in the cache
+    misses : int
+        Number of configurations of the most recent run that had to be played
+
+    Methods
+    -------
+    key(config, num_plays, seed):
+        Computes the cache key of a configuration.
+    run(configs, num_plays, seed=0, workers=1, executor='process'):
+        Plays every configuration not found in the cache and returns all of them as loaded Games.
+    evict(keep=()):
+        Trims the cache back to max_cache_bytes.
+    """
+    def __init__(self, cache_dir, max_cache_bytes = 10 * 2**30):
+        """
+        Constructs all the necessary attributes for the Sweep object.
+
+        INPUTS:
+        cache_dir : str (created if missing)
+        max_cache_bytes : int
+        """
+        self.cache_dir = cache_dir
+        self.max_cache_bytes = max_cache_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, config, num_plays, seed):
+        '''
+        PURPOSE: This method computes the cache key of a configuration: a hash of every die's faces and weights in order,
+        the seed, the number of plays and the block size plays are drawn in.
+
+        INPUTS:
+        config list of Die objects or of (faces, weights) pairs
+        num_plays int
+        seed int
+
+        OUTPUT:
+        Hexadecimal string
+        '''
+        digest = hashlib.sha256()
+        digest.update(repr((num_plays, seed, _BLOCK_SIZE)).encode())
+        for faces, weights, large in _dice_spec(config):
+            for values in (faces, weights.astype(float)):
+                digest.update(values.dtype.str.encode())
+                digest.update(repr(values.shape).encode())
+                digest.update(np.ascontiguousarray(values).tobytes())
+        return digest.hexdigest()
+
+    def run(self, configs, num_plays, seed = 0, workers = 1, executor = 'process'):
+        '''
+        PURPOSE: This method plays every configuration not found in the cache, on a worker pool,
+        and returns all of them as Games loaded from the cache. Repeated configurations are only played once.
+
+        INPUTS:
+        configs list of configurations (each a list of Die objects or of (faces, weights) pairs)
+        num_plays int
+        seed int
+        workers int (number of parallel workers)
+        executor str ('thread' or 'process')
+
+        OUTPUT:
+        Returns a list of Game objects, one per configuration, with memory-mapped results.
+        Returns error message for invalid seed or executor.
+        '''
+        if not isinstance(seed, (int, np.integer)):
+            return "Please choose an integer seed."
+        keys = [self.key(config, num_plays, seed) for config in configs]
+        missing = {}
+        for key, config in zip(keys, configs):
+            if not os.path.isdir(os.path.join(self.cache_dir, key)):
+                missing.setdefault(key, _dice_spec(config))
+        self.misses = len(missing)
+        self.hits = len(set(keys)) - self.misses
+
+        if workers > 1 and missing:
+            pool = _make_pool(executor, workers)
+            if pool is None:
+                return "Not a valid executor. Try again."
+            with pool:
+                futures = [pool.submit(_run_config, spec, num_plays, seed, os.path.join(self.cache_dir, key)) for key, spec in missing.items()]
+                for future in futures:
+                    future.result()
+        else:
+            for key, spec in missing.items():
+                _run_config(spec, num_plays, seed, os.path.join(self.cache_dir, key))
+
+        games = []
+        for key in keys:
+            path = os.path.join(self.cache_dir, key)
+            #Mark the entry as recently used
+            os.utime(path)
+            games.append(Game.load(path))
+        self.evict(keep=keys)
+        return games
+
+    def evict(self, keep = ()):
+        '''
+        PURPOSE: This method trims the cache back to max_cache_bytes, evicting least recently used entries first.
+
+        INPUTS:
+        keep collection of keys that must not be evicted
+
+        OUTPUT:
+        None
+        '''
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_dir() and not entry.name.endswith('.tmp'):
+                entries.append((entry.stat().st_mtime, entry.name, _directory_size(entry.path)))
+        total = sum(size for _, _, size in entries)
+        keep = set(keep)
+        for _, name, size in sorted(entries):
+            if total <= self.max_cache_bytes:
+                break
+            if name not in keep:
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+                total -= size
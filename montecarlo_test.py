@@ -1,8 +1,21 @@
 from montecarlo_dir.montecarlo import Die
+from montecarlo_dir.montecarlo import LargeDie
 from montecarlo_dir.montecarlo import Game
 from montecarlo_dir.montecarlo import Analyzer
+from montecarlo_dir.montecarlo import ExactAnalyzer
+from montecarlo_dir.montecarlo import instrument
+from montecarlo_dir.montecarlo import async_pool
+from montecarlo_dir.sweep import Sweep
+from montecarlo_dir import benchmark
+from montecarlo_dir import cli
+import asyncio
+import json
 import pandas as pd
 import numpy as np
+import subprocess
+import sys
+import tempfile
+import os
 import unittest
 
 class DieTestSuite(unittest.TestCase):
@@ -70,6 +83,65 @@ class DieTestSuite(unittest.TestCase):
         test_dataframe_7 = pd.DataFrame(data=test_data_7)
         self.assertTrue((test_7_object.show_current()==(test_dataframe_7)).all().all())
 
+    def test_19_roll(self):
+        """
+        Test rolls are reproducible for a given seed and codes index into the faces array.
+        """
+        test_19_object = Die(np.array(['one','two','three','four','five','six']))
+        test_19_object.change_weight("two", 5)
+        test_19_codes = test_19_object.roll(num_rolls=100, seed=23, codes=True)
+        test_19_faces = test_19_object.roll(num_rolls=100, seed=23)
+
+        self.assertTrue((test_19_object.faces[test_19_codes] == test_19_faces).all())
+
+    def test_20_roll(self):
+        """
+        Test a face with zero weight is never rolled.
+        """
+        test_20_object = Die(np.array([1,2,3]), seed=5)
+        test_20_object.change_weight(2, 0)
+
+        self.assertTrue(2 not in test_20_object.roll(num_rolls=1000))
+
+    def test_37_roll(self):
+        """
+        Test stratified rolls of a fair die land on every face equally often and antithetic rolls mirror each other.
+        """
+        test_37_object = Die(np.array(['one','two','three','four','five','six']), seed=6)
+        test_37_list = list(test_37_object.roll(num_rolls=600, sampling='stratified'))
+        test_37_coin = Die(np.array(['heads','tails']))
+        test_37_pairs = test_37_coin.roll(num_rolls=10, seed=6, sampling='antithetic')
+
+        self.assertTrue(all(test_37_list.count(face) == 100 for face in test_37_object.faces))
+        self.assertTrue((test_37_pairs[:5] != test_37_pairs[5:]).all())
+        self.assertTrue(test_37_object.roll(num_rolls=3, sampling='invalid') == "Not a valid sampling. Try again.")
+
+    def test_42_change_weight(self):
+        """
+        Test the die version only changes when a weight actually changes.
+        """
+        test_42_object = Die(np.array(['one','two','three']))
+        test_42_object.change_weight('one', 1)
+        test_42_unchanged = test_42_object.version
+        test_42_object.change_weight('one', 3)
+
+        self.assertTrue(test_42_unchanged == 0 and test_42_object.version == 1)
+
+    def test_48_change_weights(self):
+        """
+        Test a large die rolls like a die with the same weights and batch weight changes are all or nothing.
+        """
+        test_48_object = LargeDie(np.arange(1000))
+        test_48_object.change_weights({3: 0, 5: 2.5, 999: 10})
+        test_48_die = Die(np.arange(1000))
+        for face, weight in {3: 0, 5: 2.5, 999: 10}.items():
+            test_48_die.change_weight(face, weight)
+        test_48_invalid = test_48_object.change_weights({7: 4, 'seven': 4})
+
+        self.assertTrue(np.array_equal(test_48_object.roll(num_rolls=500, seed=8), test_48_die.roll(num_rolls=500, seed=8)))
+        self.assertTrue(test_48_invalid == "Please choose a valid face value." and test_48_object.weights[7] == 1)
+        self.assertTrue(test_48_object.show_current()['weights'].sum() == test_48_die.show_current()['weights'].sum())
+
 class GameTestSuite(unittest.TestCase):
     """
     Tests methods in the Game class in a Monte Carlo simulator. 
@@ -128,6 +200,201 @@ class GameTestSuite(unittest.TestCase):
 
         self.assertTrue(test_12_object.game_df_narrow.shape == (16,))
 
+    def test_21_play(self):
+        """
+        Test play stores an N rolls by M dice uint8 face-code matrix that decodes to the wide form.
+        """
+        test_21_object = Game([Die(np.array(['one','two','three','four','five','six'])),Die(np.array(['a','b']))], seed=7)
+        test_21_object.play(8)
+        test_21_codes, test_21_faces = test_21_object.show_codes()
+        test_21_wide = test_21_object.show(form = 'wide')
+
+        self.assertTrue(test_21_codes.shape == (8,2) and test_21_codes.dtype == np.uint8)
+        self.assertTrue((test_21_faces[1][test_21_codes[:,1]] == test_21_wide['Die 2'].to_numpy()).all())
+
+    def test_22_show(self):
+        """
+        Test show returns a cached categorical dataframe until the next play.
+        """
+        test_22_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_22_object.play(8)
+        test_22_wide = test_22_object.show(form = 'wide')
+
+        self.assertTrue(test_22_object.show(form = 'wide') is test_22_wide)
+        self.assertTrue(str(test_22_wide['Die 1'].dtype) == 'category')
+        test_22_object.play(8)
+        self.assertFalse(test_22_object.show(form = 'wide') is test_22_wide)
+
+    def test_23_play_stream(self):
+        """
+        Test streamed chunks match the in-memory face-code matrix for the same seed.
+        """
+        test_23_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_23_object.play(40000, seed=11)
+        test_23_codes, test_23_faces = test_23_object.show_codes()
+        test_23_chunks = [chunk.copy() for chunk in test_23_object.play_stream(40000, chunk_size=10000, seed=11)]
+
+        self.assertTrue(len(test_23_chunks) == 3)
+        self.assertTrue((np.concatenate(test_23_chunks) == test_23_codes).all())
+
+    def test_25_play(self):
+        """
+        Test parallel plays with threads or processes are identical to a single worker play for the same seed.
+        """
+        test_25_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_25_object.play(40000, seed=5)
+        test_25_codes = test_25_object.show_codes()[0]
+        test_25_object.play(40000, seed=5, workers=3)
+        test_25_thread_codes = test_25_object.show_codes()[0]
+        test_25_object.play(40000, seed=5, workers=2, executor='process')
+        test_25_process_codes = test_25_object.show_codes()[0]
+
+        self.assertTrue((test_25_thread_codes == test_25_codes).all())
+        self.assertTrue((test_25_process_codes == test_25_codes).all())
+
+    def test_38_play(self):
+        """
+        Test importance sampled plays carry likelihood ratio weights and invalid proposals are rejected.
+        """
+        test_38_object = Game([Die(np.array(['one','two'])),Die(np.array(['one','two']))])
+        test_38_object.play(1000, seed=2, proposal=[np.array([3,1]), np.array([1,1])])
+        test_38_codes = test_38_object.show_codes()[0]
+        test_38_weights = test_38_object.show_weights()
+        test_38_expected = np.where(test_38_codes[:,0] == 0, (1/2)/(3/4), (1/2)/(1/4))
+
+        self.assertTrue(np.allclose(test_38_weights, test_38_expected))
+        self.assertTrue(test_38_object.play(10, proposal=[np.array([0,1]), np.array([1,1])]) == "Not a valid proposal. Try again.")
+
+    def test_40_load(self):
+        """
+        Test a play written to a results directory loads back memory-mapped with the same codes, dice and seed.
+        """
+        test_40_die = Die(np.array(['one','two','three']))
+        test_40_die.change_weight('one', 4)
+        test_40_object = Game([test_40_die, Die(np.array(['one','two','three']))])
+        with tempfile.TemporaryDirectory() as test_40_path:
+            test_40_object.play(30000, seed=12, path=test_40_path)
+            test_40_loaded = Game.load(test_40_path)
+            test_40_codes = test_40_loaded.show_codes()[0]
+
+            self.assertTrue(isinstance(test_40_codes, np.memmap))
+            self.assertTrue((test_40_codes == test_40_object.show_codes()[0]).all())
+            self.assertTrue(list(test_40_loaded.DieList[0].weights) == [4,1,1])
+            self.assertTrue(test_40_loaded.last_seed.entropy == 12)
+            del test_40_codes, test_40_loaded, test_40_object
+
+    def test_50_instrument(self):
+        """
+        Test instrumented runs record per-stage stats and call back, and nothing is recorded once disabled.
+        """
+        test_50_seen = []
+        test_50_object = Game([Die(np.array(['H','T'])) for i in range(3)])
+        instrument(callback=test_50_seen.append, memory=True)
+        try:
+            test_50_object.play(1000, seed=50)
+            test_50_play_stats = test_50_object.last_run_stats
+            test_50_analyzer_object = Analyzer(test_50_object)
+            test_50_analyzer_object.combo()
+        finally:
+            instrument(False)
+        test_50_object.play(10, seed=50)
+
+        self.assertTrue([stage['stage'] for stage in test_50_play_stats.stages] == ['sample'])
+        self.assertTrue(test_50_play_stats.stages[0]['rows'] == 1000 and test_50_play_stats.stages[0]['bytes'] == 3000)
+        self.assertTrue([stage['stage'] for stage in test_50_analyzer_object.last_run_stats.stages] == ['encode', 'count', 'decode'])
+        self.assertTrue(test_50_analyzer_object.last_run_stats.peak_bytes > 0)
+        self.assertTrue([stats.method for stats in test_50_seen] == ['Game.play', 'Analyzer.combo'])
+        self.assertTrue(test_50_object.last_run_stats is test_50_play_stats)
+
+    def test_54_play_async(self):
+        """
+        Test play_async matches play for a seed, reports progress, and leaves the previous play in place when cancelled.
+        """
+        test_54_object = Game([Die(np.array([1,2,3,4,5,6])) for i in range(3)])
+        test_54_expected = Game([Die(np.array([1,2,3,4,5,6])) for i in range(3)])
+        test_54_expected.play(50000, seed=54)
+        test_54_progress = []
+
+        async def test_54_cancel():
+            test_54_task = asyncio.ensure_future(test_54_object.play_async(10**7, chunk_size=1 << 14))
+            await asyncio.sleep(0)
+            test_54_task.cancel()
+            try:
+                await test_54_task
+            except asyncio.CancelledError:
+                return True
+            return False
+
+        asyncio.run(test_54_object.play_async(50000, seed=54, chunk_size=20000, progress=lambda done, total: test_54_progress.append(done)))
+        self.assertTrue(np.array_equal(test_54_object.show_codes()[0], test_54_expected.show_codes()[0]))
+        self.assertTrue(test_54_progress[-1] == 50000 and len(test_54_progress) > 1)
+        self.assertTrue(asyncio.run(test_54_cancel()))
+        self.assertTrue(np.array_equal(test_54_object.show_codes()[0], test_54_expected.show_codes()[0]))
+
+    def test_60_load(self):
+        """
+        Test a play seeded from a Generator saves and loads back with a seed that replays it.
+        """
+        test_60_object = Game([Die(np.array([1,2,3])) for i in range(2)])
+        with tempfile.TemporaryDirectory() as test_60_path:
+            test_60_object.play(1000, seed=np.random.default_rng(60), path=test_60_path)
+            test_60_loaded = Game.load(test_60_path)
+            test_60_replay = Game([Die(np.array([1,2,3])) for i in range(2)])
+            test_60_replay.play(1000, seed=test_60_loaded.last_seed)
+
+            self.assertTrue((test_60_replay.show_codes()[0] == test_60_object.show_codes()[0]).all())
+            del test_60_loaded, test_60_object
+
+    def test_62_load(self):
+        """
+        Test loading a results directory keeps each die's kind and weights.
+        """
+        test_62_object = Game([LargeDie(np.arange(50000), np.arange(50000) % 7 + 1), Die(np.array([1,2]))])
+        test_62_object.DieList[1].change_weight(2, 3)
+        with tempfile.TemporaryDirectory() as test_62_path:
+            test_62_object.play(100, seed=62, path=test_62_path)
+            test_62_loaded = Game.load(test_62_path)
+
+            self.assertTrue(type(test_62_loaded.DieList[0]) is LargeDie and type(test_62_loaded.DieList[1]) is Die)
+            self.assertTrue((test_62_loaded.DieList[0].weights == test_62_object.DieList[0].weights).all())
+            self.assertTrue(list(test_62_loaded.DieList[1].weights) == [1, 3])
+            del test_62_loaded, test_62_object
+
+    def test_63_play_async(self):
+        """
+        Test play_async keeps running and matches play when the shared pool is resized mid-run.
+        """
+        test_63_object = Game([Die(np.array([1,2,3])) for i in range(2)])
+        test_63_expected = Game([Die(np.array([1,2,3])) for i in range(2)])
+        test_63_expected.play(100000, seed=63)
+        test_63_resize = lambda done, total: async_pool(2) if done < total else None
+
+        asyncio.run(test_63_object.play_async(100000, seed=63, chunk_size=1 << 14, progress=test_63_resize))
+        self.assertTrue(np.array_equal(test_63_object.show_codes()[0], test_63_expected.show_codes()[0]))
+
+    def test_64_show(self):
+        """
+        Test a die listing a face more than once plays and shows that face as one category.
+        """
+        test_64_object = Game([Die(np.array(['a','a','b'])), Die(np.array(['a','b']))])
+        test_64_object.play(3000, seed=64)
+        test_64_wide = test_64_object.show('wide')
+
+        self.assertTrue(list(test_64_wide['Die 1'].cat.categories) == ['a', 'b'])
+        self.assertTrue(abs((test_64_wide['Die 1'] == 'a').mean() - 2/3) < 0.05)
+        self.assertTrue(len(test_64_object.show('narrow')) == 6000)
+
+    def test_71_play_counts(self):
+        """
+        Test counts-only plays count every die once when a face is listed more than once on a die.
+        """
+        test_71_object = Game([Die(np.array([1,1,2])) for i in range(3)])
+        test_71_object.play_counts(5000, seed=71)
+        test_71_counts, test_71_faces = test_71_object.show_counts()
+
+        self.assertTrue(list(test_71_faces) == [1, 2] and (test_71_counts.sum(axis=1) == 3).all())
+        self.assertTrue(abs(test_71_counts[:, 0].mean() - 2) < 0.05)
+
 class AnalyzerTestSuite(unittest.TestCase):
     """
     Tests methods in the Analyzer class in a Monte Carlo simulator. 
@@ -257,5 +524,540 @@ class AnalyzerTestSuite(unittest.TestCase):
 
         self.assertTrue(test_18_analyzer_object.face_counts_per_roll_results.equals(test_expected_result_18_df_indexed))
 
+    def test_24_stream(self):
+        """
+        Test streamed jackpot count, face totals and combo counts match the in-memory results for the same seed.
+        """
+        test_24_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_24_object.play(40000, seed=3)
+        test_24_analyzer_object = Analyzer(test_24_object)
+        test_24_jackpot = test_24_analyzer_object.jackpot()
+        test_24_wide = test_24_object.show(form = 'wide')
+
+        test_24_analyzer_object.stream(40000, chunk_size=10000, seed=3)
+
+        self.assertTrue(test_24_analyzer_object.jackpot_count == test_24_jackpot)
+        self.assertTrue(test_24_analyzer_object.face_totals_results['two'] == (test_24_wide == 'two').sum().sum())
+        self.assertTrue(test_24_analyzer_object.combo_results_sort['count'].sum() == 40000)
+        self.assertTrue(len(test_24_analyzer_object.combo_results_sort) == 9)
+
+    def test_26_stream(self):
+        """
+        Test merged per-worker accumulators match a single worker stream for the same seed.
+        """
+        test_26_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_26_analyzer_object = Analyzer(test_26_object)
+        test_26_jackpot = test_26_analyzer_object.stream(40000, seed=9)
+        test_26_combos = test_26_analyzer_object.combo_results_index
+
+        self.assertTrue(test_26_analyzer_object.stream(40000, seed=9, workers=2, executor='process') == test_26_jackpot)
+        self.assertTrue(test_26_analyzer_object.combo_results_index.equals(test_26_combos))
+
+    def test_27_face_counts_per_roll(self):
+        """
+        Test face_counts_per_roll array form covers every face, including faces never rolled.
+        """
+        test_27_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three','four']))])
+        test_27_object.play(50, seed=2)
+        test_27_analyzer_object = Analyzer(test_27_object)
+        test_27_analyzer_object.face_counts_per_roll(form='array')
+        test_27_counts = test_27_analyzer_object.face_counts_per_roll_results
+
+        self.assertTrue(list(test_27_analyzer_object.face_counts_faces) == ['four','one','three','two'])
+        self.assertTrue(test_27_counts.shape == (50,4) and (test_27_counts.sum(axis=1) == 2).all())
+
+    def test_28_combo(self):
+        """
+        Test combo top_k and min_count keep only the most frequent combinations.
+        """
+        test_28_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_28_object.play(3)
+        test_28_object.show(form = 'wide')
+        test_Game_data_28 = {'Die 1': ['one','one','one','two','two','three'], 'Die 2': ['one','one','one','two','two','one']}
+        test_28_object.game_df_wide = pd.DataFrame(data=test_Game_data_28)
+
+        test_28_analyzer_object = Analyzer(test_28_object)
+        test_28_analyzer_object.combo(top_k=1)
+        self.assertTrue(test_28_analyzer_object.combo_results_sort['count'].tolist() == [3])
+        test_28_analyzer_object.combo(min_count=2)
+        self.assertTrue(test_28_analyzer_object.combo_results_sort['count'].tolist() == [3,2])
+
+    def test_29_combo(self):
+        """
+        Test combo counts every roll when the number of possible combinations overflows a 64-bit key.
+        """
+        test_29_object = Game([Die(np.array([1,2,3,4,5,6])) for i in range(30)], seed=4)
+        test_29_object.play(100)
+        test_29_analyzer_object = Analyzer(test_29_object)
+        test_29_analyzer_object.combo()
+
+        self.assertTrue(test_29_analyzer_object.combo_results_sort['count'].sum() == 100)
+        self.assertTrue(test_29_analyzer_object.combo_results_index.index.nlevels == 30)
+
+    def test_30_combo(self):
+        """
+        Test unordered combo counts rolls with the same faces on different dice together.
+        """
+        test_30_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_30_object.play(3)
+        test_30_object.show(form = 'wide')
+        test_Game_data_30 = {'Die 1': ['one','two','two'], 'Die 2': ['two','one','two']}
+        test_30_object.game_df_wide = pd.DataFrame(data=test_Game_data_30)
+
+        test_expected_result_30_list = {'Die 1': ['one','two'], 'Die 2': ['two','two'], 'count': [2, 1]}
+        test_expected_result_30_df_indexed = pd.DataFrame(data=test_expected_result_30_list).set_index(['Die 1', 'Die 2'])
+
+        test_30_analyzer_object = Analyzer(test_30_object)
+        test_30_analyzer_object.combo(ordered=False)
+
+        self.assertTrue(test_30_analyzer_object.combo_results_index.equals(test_expected_result_30_df_indexed))
+
+    def test_31_combo(self):
+        """
+        Test unordered combo with many dice (count vector keys) matches counting sorted rolls directly.
+        """
+        test_31_object = Game([Die(np.array(['a','b','c'])) for i in range(20)], seed=8)
+        test_31_object.play(200)
+        test_31_analyzer_object = Analyzer(test_31_object)
+        test_31_analyzer_object.combo(ordered=False)
+
+        test_31_rolls = test_31_object.show(form = 'wide').to_numpy().astype(str)
+        test_31_expected = pd.Series([tuple(sorted(row)) for row in test_31_rolls]).value_counts()
+        test_31_result = test_31_analyzer_object.combo_results_index['count']
+
+        self.assertTrue(len(test_31_result) == len(test_31_expected))
+        self.assertTrue(all(test_31_result[key] == count for key, count in test_31_expected.items()))
+
+    def test_35_play_until(self):
+        """
+        Test play_until stops once the jackpot rate is precise enough and the interval covers the exact rate.
+        """
+        test_35_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_35_analyzer_object = Analyzer(test_35_object)
+        test_35_results = test_35_analyzer_object.play_until(half_width=0.01, seed=1)
+
+        self.assertTrue(test_35_results['half_width'] <= 0.01)
+        self.assertTrue(test_35_results['num_plays'] < 10**6)
+        self.assertTrue(test_35_results['ci'][0] <= 1/3 <= test_35_results['ci'][1])
+
+    def test_36_play_until(self):
+        """
+        Test play_until stops at the play budget and rejects invalid targets.
+        """
+        test_36_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_36_analyzer_object = Analyzer(test_36_object)
+        test_36_results = test_36_analyzer_object.play_until('face', 'one', half_width=1e-9, max_plays=20000, seed=1)
+
+        self.assertTrue(test_36_results['num_plays'] == 20000)
+        self.assertTrue(test_36_analyzer_object.play_until('face', 'seven') == "Please choose a valid face value.")
+
+    def test_39_jackpot(self):
+        """
+        Test jackpot of an importance sampled game is a weighted estimate close to the exact count.
+        """
+        test_39_object = Game([Die(np.array(['one','two','three','four'])) for i in range(4)])
+        test_39_object.play(40000, seed=2, proposal=[np.array([4,1,1,1])] * 4)
+        test_39_analyzer_object = Analyzer(test_39_object)
+        test_39_exact = ExactAnalyzer(test_39_object, num_plays=40000).jackpot()
+
+        self.assertTrue(isinstance(test_39_analyzer_object.jackpot(), float))
+        self.assertTrue(abs(test_39_analyzer_object.jackpot() - test_39_exact) < 0.1 * test_39_exact)
+
+    def test_41_accumulate(self):
+        """
+        Test accumulate over loaded results, in chunks and in worker processes, matches jackpot on the played game.
+        """
+        test_41_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        with tempfile.TemporaryDirectory() as test_41_path:
+            test_41_object.play(30000, seed=12, path=test_41_path)
+            test_41_jackpot = Analyzer(test_41_object).jackpot()
+            test_41_analyzer_object = Analyzer(Game.load(test_41_path))
+
+            self.assertTrue(test_41_analyzer_object.accumulate(chunk_size=7000) == test_41_jackpot)
+            self.assertTrue(test_41_analyzer_object.accumulate(workers=2, executor='process') == test_41_jackpot)
+            self.assertTrue(test_41_analyzer_object.face_totals_results.sum() == 60000)
+            del test_41_analyzer_object, test_41_object
+
+    def test_43_combo(self):
+        """
+        Test combo results are reused until the game is played again.
+        """
+        test_43_object = Game([Die(np.array(['one','two','three'])),Die(np.array(['one','two','three']))])
+        test_43_object.play(100, seed=1)
+        test_43_analyzer_object = Analyzer(test_43_object)
+        test_43_analyzer_object.combo()
+        test_43_first = test_43_analyzer_object.combo_results_index
+        test_43_analyzer_object.face_counts_per_roll()
+        test_43_analyzer_object.combo()
+
+        self.assertTrue(test_43_analyzer_object.combo_results_index is test_43_first)
+        test_43_object.play(100, seed=2)
+        test_43_analyzer_object.combo()
+        self.assertFalse(test_43_analyzer_object.combo_results_index is test_43_first)
+
+    def test_47_play_counts(self):
+        """
+        Test a counts-only play of identical dice gives face counts, jackpots and unordered combos.
+        """
+        test_47_object = Game([Die(np.array(['H','T'])) for i in range(50)])
+        test_47_object.play_counts(2000, seed=3)
+        test_47_analyzer_object = Analyzer(test_47_object)
+        test_47_analyzer_object.face_counts_per_roll()
+        test_47_counts = test_47_analyzer_object.face_counts_per_roll_results
+        test_47_analyzer_object.combo(ordered=False)
+
+        self.assertTrue((test_47_counts.sum(axis=1) == 50).all())
+        self.assertTrue(abs(test_47_counts['H'].mean() - 25) < 1)
+        self.assertTrue(test_47_analyzer_object.combo_results_sort['count'].sum() == 2000)
+        self.assertTrue(test_47_analyzer_object.combo() == "Only face counts were played. Try ordered=False.")
+
+    def test_53_bootstrap(self):
+        """
+        Test bootstrap intervals cover the true jackpot rate and face frequency and are reproducible for a seed.
+        """
+        test_53_object = Game([Die(np.array(['H','T'])) for i in range(3)])
+        test_53_object.play(5000, seed=53)
+        test_53_analyzer_object = Analyzer(test_53_object)
+        test_53_jackpot = test_53_analyzer_object.bootstrap('jackpot', num_resamples=400, seed=1)
+        test_53_faces = test_53_analyzer_object.bootstrap('face', num_resamples=400, method='multinomial', seed=1)
+        test_53_combos = test_53_analyzer_object.bootstrap('combo', num_resamples=400, top_k=2, seed=1)
+
+        self.assertTrue(test_53_jackpot.loc['jackpot', 'lower'] < 0.25 < test_53_jackpot.loc['jackpot', 'upper'])
+        self.assertTrue(test_53_faces.loc['H', 'lower'] < 0.5 < test_53_faces.loc['H', 'upper'])
+        self.assertTrue(len(test_53_combos) == 2 and (test_53_combos['lower'] < test_53_combos['estimate']).all())
+        self.assertTrue(Analyzer(test_53_object).bootstrap('jackpot', num_resamples=400, seed=1).equals(test_53_jackpot))
+
+    def test_55_combo_async(self):
+        """
+        Test combo_async gives the same ordered and unordered combinations as combo when run concurrently.
+        """
+        test_55_object = Game([Die(np.array(['H','T'])) for i in range(4)])
+        test_55_object.play(20000, seed=55)
+        test_55_analyzer_object = Analyzer(test_55_object)
+        test_55_unordered_object = Analyzer(test_55_object)
+        test_55_expected = Analyzer(test_55_object)
+
+        async def test_55_both():
+            await asyncio.gather(test_55_analyzer_object.combo_async(chunk_size=3000),
+                                 test_55_unordered_object.combo_async(ordered=False, chunk_size=3000))
+
+        asyncio.run(test_55_both())
+        test_55_expected.combo()
+        self.assertTrue(test_55_analyzer_object.combo_results_sort.equals(test_55_expected.combo_results_sort))
+        test_55_expected.combo(ordered=False)
+        self.assertTrue(test_55_unordered_object.combo_results_sort.equals(test_55_expected.combo_results_sort))
+
+    def test_56_jackpot(self):
+        """
+        Test analyzing after play, show and a second play uses the second play, not the dataframe shown before it.
+        """
+        test_56_object = Game([Die(np.array([1,2])) for i in range(2)])
+        test_56_object.play(1000, seed=56)
+        test_56_object.show()
+        test_56_object.play(50, seed=57)
+        test_56_analyzer_object = Analyzer(test_56_object)
+        test_56_expected = int((test_56_object.show_codes()[0][:, 0] == test_56_object.show_codes()[0][:, 1]).sum())
+
+        self.assertTrue(test_56_analyzer_object.jackpot() == test_56_expected)
+        self.assertTrue(len(test_56_analyzer_object.jackpot_results) == 50)
+
+    def test_57_face_counts_per_roll(self):
+        """
+        Test form='sparse' matches the array form when scipy is installed and returns an error message otherwise.
+        """
+        test_57_object = Game([Die(np.array(['a','b','c'])) for i in range(3)])
+        test_57_object.play(200, seed=57)
+        test_57_analyzer_object = Analyzer(test_57_object)
+        test_57_analyzer_object.face_counts_per_roll(form='array')
+        test_57_expected = test_57_analyzer_object.face_counts_per_roll_results
+        test_57_result = test_57_analyzer_object.face_counts_per_roll(form='sparse')
+
+        try:
+            import scipy
+        except ImportError:
+            self.assertTrue(isinstance(test_57_result, str))
+        else:
+            self.assertTrue(np.array_equal(test_57_analyzer_object.face_counts_per_roll_results.toarray(), test_57_expected))
+
+    def test_58_combo(self):
+        """
+        Test unordered combinations of many dice with many faces are counted instead of overflowing.
+        """
+        test_58_object = Game([Die(np.arange(400)) for i in range(10)])
+        test_58_object.play(500, seed=58)
+        test_58_analyzer_object = Analyzer(test_58_object)
+        test_58_analyzer_object.combo(ordered=False)
+
+        self.assertTrue(test_58_analyzer_object.combo_results_sort['count'].sum() == 500)
+
+    def test_61_accumulate(self):
+        """
+        Test accumulate weights importance sampled plays like jackpot and combo, in memory and from a results directory.
+        """
+        test_61_object = Game([Die(np.array([1,2,3,4])) for i in range(3)])
+        with tempfile.TemporaryDirectory() as test_61_path:
+            test_61_object.play(20000, seed=61, proposal=[np.array([4,1,1,1])] * 3, path=test_61_path)
+            test_61_analyzer_object = Analyzer(test_61_object)
+            test_61_loaded_object = Analyzer(Game.load(test_61_path))
+            test_61_expected = test_61_analyzer_object.jackpot()
+
+            self.assertTrue(np.isclose(test_61_analyzer_object.accumulate(chunk_size=3000), test_61_expected))
+            self.assertTrue(np.isclose(test_61_loaded_object.accumulate(workers=2, executor='process'), test_61_expected))
+            self.assertTrue(np.isclose(test_61_analyzer_object.face_totals_results.sum(), 60000, rtol=0.05))
+            del test_61_loaded_object, test_61_analyzer_object, test_61_object
+
+    def test_65_combo(self):
+        """
+        Test combo, stream and accumulate count a face listed more than once on a die as one face.
+        """
+        test_65_object = Game([Die(np.array(['a','a','b'])) for i in range(2)])
+        test_65_analyzer_object = Analyzer(test_65_object)
+        test_65_analyzer_object.stream(3000, seed=65)
+        test_65_streamed = test_65_analyzer_object.combo_results_sort
+        test_65_object.play(3000, seed=65)
+        test_65_analyzer_object.combo()
+
+        self.assertTrue(len(test_65_analyzer_object.combo_results_sort) == 4)
+        self.assertTrue(test_65_analyzer_object.combo_results_sort.equals(test_65_streamed))
+        test_65_analyzer_object.accumulate()
+        self.assertTrue(test_65_analyzer_object.combo_results_sort.equals(test_65_streamed))
+
+    def test_67_play_until(self):
+        """
+        Test a loose target with a small first batch stops within the first block of plays.
+        """
+        test_67_object = Analyzer(Game([Die(np.array(['H','T'])) for i in range(2)]))
+        test_67_results = test_67_object.play_until(half_width=0.05, batch_size=100, seed=67)
+
+        self.assertTrue(test_67_results['num_plays'] < 2000 and test_67_results['half_width'] <= 0.05)
+
+    def test_68_combo(self):
+        """
+        Test combo keeps importance sampled combinations whose summed sample weights are below 1.
+        """
+        test_68_object = Game([Die(np.array([1,2,3,4])) for i in range(3)])
+        test_68_object.play(40, seed=1, proposal=[np.array([1,1,1,20])] * 3)
+        test_68_analyzer_object = Analyzer(test_68_object)
+        test_68_analyzer_object.combo()
+
+        self.assertTrue(np.isclose(test_68_analyzer_object.combo_results_sort['count'].sum(), test_68_object.show_weights().sum()))
+        self.assertTrue((test_68_analyzer_object.combo_results_sort['count'] < 1).any())
+
+    def test_69_play_until(self):
+        """
+        Test play_until and stream leave the seed of the stored results in place.
+        """
+        test_69_object = Game([Die(np.array([1,2,3])) for i in range(2)])
+        test_69_object.play(1000, seed=5)
+        test_69_analyzer_object = Analyzer(test_69_object)
+        test_69_analyzer_object.play_until(half_width=0.05, seed=99)
+        test_69_analyzer_object.stream(1000, seed=98)
+        test_69_replay = Game([Die(np.array([1,2,3])) for i in range(2)])
+        test_69_replay.play(1000, seed=test_69_object.last_seed)
+
+        self.assertTrue((test_69_replay.show_codes()[0] == test_69_object.show_codes()[0]).all())
+
+    def test_72_stream(self):
+        """
+        Test stream and accumulate count without importing pandas, and build their dataframes on request.
+        """
+        test_72_script = ('import sys\n'
+                          'import numpy as np\n'
+                          'from montecarlo_dir.montecarlo import Die, Game, Analyzer\n'
+                          'game = Game([Die(np.array([1,2])) for i in range(2)])\n'
+                          'analyzer = Analyzer(game)\n'
+                          'analyzer.stream(1000, seed=72)\n'
+                          'game.play(1000, seed=72)\n'
+                          'analyzer.accumulate()\n'
+                          'print("pandas" in sys.modules, len(analyzer.combo_results_sort))')
+        test_72_output = subprocess.run([sys.executable, '-c', test_72_script], check=True, capture_output=True, text=True).stdout
+
+        self.assertTrue(test_72_output.split() == ['False', '4'])
+
+class ExactAnalyzerTestSuite(unittest.TestCase):
+    """
+    Tests methods in the ExactAnalyzer class in a Monte Carlo simulator. 
+    """
+    def test_32_jackpot(self):
+        """
+        Test exact jackpot count for two fair six-sided dice is one sixth of the plays.
+        """
+        test_32_object = Game([Die(np.array(['one','two','three','four','five','six'])),Die(np.array(['one','two','three','four','five','six']))])
+        test_32_analyzer_object = ExactAnalyzer(test_32_object, num_plays=600)
+
+        self.assertTrue(abs(test_32_analyzer_object.jackpot() - 100) < 1e-9)
+
+    def test_33_combo(self):
+        """
+        Test exact ordered and unordered combos of weighted dice add up to the number of plays and agree with each other.
+        """
+        test_33_die = Die(np.array(['a','b']))
+        test_33_die.change_weight('a', 3)
+        test_33_object = Game([test_33_die, Die(np.array(['a','b']))])
+        test_33_analyzer_object = ExactAnalyzer(test_33_object, num_plays=80)
+        test_33_analyzer_object.combo()
+        test_33_ordered = test_33_analyzer_object.combo_results_index['count']
+        test_33_analyzer_object.combo(ordered=False)
+        test_33_unordered = test_33_analyzer_object.combo_results_index['count']
+
+        self.assertTrue(abs(test_33_ordered.sum() - 80) < 1e-9)
+        self.assertTrue(abs(test_33_ordered[('a','a')] - 30) < 1e-9)
+        self.assertTrue(abs(test_33_unordered[('a','b')] - (test_33_ordered[('a','b')] + test_33_ordered[('b','a')])) < 1e-9)
+
+    def test_34_face_counts_per_roll(self):
+        """
+        Test exact face count distribution of three fair coins and the combination cap.
+        """
+        test_34_object = Game([Die(np.array(['H','T'])) for i in range(3)])
+        test_34_analyzer_object = ExactAnalyzer(test_34_object, num_plays=8, max_combos=4)
+        test_34_analyzer_object.face_counts_per_roll()
+
+        self.assertTrue(np.allclose(test_34_analyzer_object.face_count_distribution_results['H'], [1/8, 3/8, 3/8, 1/8]))
+        self.assertTrue(test_34_analyzer_object.combo() == "Too many combinations to compute exactly. Try sampling instead.")
+
+    def test_44_jackpot(self):
+        """
+        Test exact jackpot is recomputed after a die weight changes.
+        """
+        test_44_die = Die(np.array(['one','two']))
+        test_44_object = Game([test_44_die, Die(np.array(['one','two']))])
+        test_44_analyzer_object = ExactAnalyzer(test_44_object, num_plays=100)
+        test_44_fair = test_44_analyzer_object.jackpot()
+        test_44_die.change_weight('one', 3)
+        test_44_object.DieList[1].change_weight('one', 3)
+
+        self.assertTrue(abs(test_44_fair - 50) < 1e-9)
+        self.assertTrue(abs(test_44_analyzer_object.jackpot() - 62.5) < 1e-9)
+
+    def test_59_combo(self):
+        """
+        Test unordered combinations of many dice with many faces return the too many combinations message instead of overflowing.
+        """
+        test_59_object = ExactAnalyzer(Game([Die(np.arange(400)) for i in range(10)]))
+
+        self.assertTrue(isinstance(test_59_object.combo(ordered=False), str))
+
+    def test_66_jackpot(self):
+        """
+        Test exact results add up the weights of a face listed more than once on a die.
+        """
+        test_66_object = ExactAnalyzer(Game([Die(np.array([1,1,2])) for i in range(3)]))
+        test_66_object.combo()
+
+        self.assertTrue(np.isclose(test_66_object.jackpot(), 1/3))
+        self.assertTrue(len(test_66_object.combo_results_sort) == 8)
+        self.assertTrue(np.isclose(test_66_object.combo_results_index.loc[(1, 1, 1), 'count'], 8/27))
+
+    def test_70_accumulate(self):
+        """
+        Test methods ExactAnalyzer inherits from Analyzer follow a new play instead of returning cached results.
+        """
+        test_70_object = Game([Die(np.array([1,2])) for i in range(2)])
+        test_70_object.play(1000, seed=70)
+        test_70_exact_object = ExactAnalyzer(test_70_object)
+        test_70_exact_object.accumulate()
+        test_70_object.play(50, seed=71)
+
+        self.assertTrue(test_70_exact_object.accumulate() == Analyzer(test_70_object).jackpot())
+
+class SweepTestSuite(unittest.TestCase):
+    """
+    Tests methods in the Sweep class in a Monte Carlo simulator.
+    """
+    def test_45_run(self):
+        """
+        Test a sweep plays each distinct configuration once and reuses cached results on the next run.
+        """
+        with tempfile.TemporaryDirectory() as test_45_dir:
+            test_45_object = Sweep(test_45_dir)
+            test_45_configs = [[(['H','T'], [1,1])] * 2, [(['H','T'], [3,1])] * 2, [(['H','T'], [1,1])] * 2]
+            test_45_first = test_45_object.run(test_45_configs, 500, seed=7)
+            test_45_misses = test_45_object.misses
+            test_45_second = test_45_object.run(test_45_configs, 500, seed=7, workers=2, executor='thread')
+
+            self.assertTrue(test_45_misses == 2)
+            self.assertTrue(test_45_object.hits == 2 and test_45_object.misses == 0)
+            self.assertTrue(np.array_equal(test_45_first[0].show_codes()[0], test_45_second[2].show_codes()[0]))
+            self.assertTrue(Analyzer(test_45_second[1]).jackpot() == Analyzer(test_45_first[1]).jackpot())
+
+    def test_46_evict(self):
+        """
+        Test the cache is trimmed back to its size limit, least recently used entries first.
+        """
+        with tempfile.TemporaryDirectory() as test_46_dir:
+            test_46_object = Sweep(test_46_dir, max_cache_bytes=0)
+            test_46_config = [Die(np.array([1,2,3]))]
+            test_46_object.run([test_46_config], 100, seed=1)
+            test_46_object.run([test_46_config], 100, seed=2)
+
+            self.assertTrue(os.listdir(test_46_dir) == [test_46_object.key(test_46_config, 100, 2)])
+
+class BenchmarkTestSuite(unittest.TestCase):
+    """
+    Tests the benchmark suite of a Monte Carlo simulator.
+    """
+    def test_49_run_benchmarks(self):
+        """
+        Test every benchmark reports time and memory and a slowdown beyond the threshold is flagged.
+        """
+        test_49_results = benchmark.run_benchmarks(num_plays=[200], num_dice=[2], num_faces=[3], face_types=['string'], repeat=1)
+        test_49_baseline = [dict(result, seconds=result['seconds'] / 2) for result in test_49_results]
+        test_49_regressions = benchmark.compare(test_49_results, test_49_baseline, threshold=0.5, min_seconds=0)
+
+        self.assertTrue([result['benchmark'] for result in test_49_results] == list(benchmark.BENCHMARKS))
+        self.assertTrue(all(result['seconds'] > 0 and result['peak_bytes'] > 0 for result in test_49_results))
+        self.assertTrue(len(test_49_regressions) == len(test_49_results))
+        self.assertTrue(benchmark.compare(test_49_results, test_49_results) == [])
+
+    def test_51_import_time(self):
+        """
+        Test importing the simulator does not import pandas.
+        """
+        test_51_result = benchmark.import_time(repeat=1)
+
+        self.assertTrue(test_51_result['seconds'] > 0)
+        self.assertFalse(test_51_result['imports_pandas'])
+
+class CliTestSuite(unittest.TestCase):
+    """
+    Tests the command line entry point of a Monte Carlo simulator.
+    """
+    def test_52_main(self):
+        """
+        Test a spec run in chunks streams every roll and matches analyzing a full play with the same seed.
+        """
+        with tempfile.TemporaryDirectory() as test_52_dir:
+            test_52_spec = {'dice': [{'faces': ['H','T'], 'weights': [3, 1], 'count': 2}, {'faces': ['H','T','X']}],
+                            'num_plays': 5000, 'seed': 52, 'chunk_size': 1000, 'rolls': 'csv'}
+            with open(os.path.join(test_52_dir, 'spec.json'), 'w') as f:
+                json.dump(test_52_spec, f)
+            test_52_status = cli.main([os.path.join(test_52_dir, 'spec.json'), '-o', os.path.join(test_52_dir, 'out'), '-q'])
+            with open(os.path.join(test_52_dir, 'out', 'summary.json')) as f:
+                test_52_summary = json.load(f)
+            with open(os.path.join(test_52_dir, 'out', 'rolls.csv')) as f:
+                test_52_lines = f.readlines()
+            test_52_object = cli.build_game(test_52_spec)
+            test_52_object.play(5000, seed=52)
+
+            self.assertTrue(test_52_status == 0)
+            self.assertTrue(len(test_52_lines) == 5001 and test_52_lines[0] == 'roll #,Die 1,Die 2,Die 3\n')
+            self.assertTrue(test_52_summary['jackpot'] == Analyzer(test_52_object).jackpot())
+            self.assertTrue(sum(test_52_summary['face_totals'].values()) == 15000)
+
+    def test_73_run(self):
+        """
+        Test faces holding commas or quotes are quoted in every CSV output.
+        """
+        with tempfile.TemporaryDirectory() as test_73_dir:
+            test_73_spec = {'dice': [{'faces': ['a,b', 'c', 'd"e'], 'count': 2}], 'num_plays': 300, 'seed': 73, 'rolls': 'csv'}
+            cli.run(test_73_spec, test_73_dir)
+            test_73_rolls = pd.read_csv(os.path.join(test_73_dir, 'rolls.csv'))
+            test_73_counts = pd.read_csv(os.path.join(test_73_dir, 'face_counts.csv'))
+            test_73_combos = pd.read_csv(os.path.join(test_73_dir, 'combos.csv'))
+
+            self.assertTrue(list(test_73_counts.columns) == ['roll #', 'a,b', 'c', 'd"e'])
+            self.assertTrue(set(test_73_rolls['Die 1']) == {'a,b', 'c', 'd"e'})
+            self.assertTrue(test_73_combos['count'].sum() == 300)
+
 if __name__ == '__main__':
     unittest.main(verbosity=3)
\ No newline at end of file
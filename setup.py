@@ -4,4 +4,6 @@ setup(student_name = 'Victor Teelucksingh',
       project_name='Monte Carlo Simulator',
       version='0.1',
       description='Create, play, and analyze Die games.',
-      packages=['montecarlo_dir'])
\ No newline at end of file
+      packages=['montecarlo_dir'],
+      extras_require={'sparse': ['scipy']},
+      entry_points={'console_scripts': ['montecarlo = montecarlo_dir.cli:main']})
\ No newline at end of file